@@ -3,17 +3,33 @@ from functools import wraps
 import os
 
 from dotenv import load_dotenv
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, abort, jsonify, send_from_directory, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 
-from models import db, User, Car, Booking, Review, Maintenance
+from assets import asset_manifest, send_asset
+from commands import register_commands
+from metrics import request_metrics
+from models import db, User, Car, Booking, Maintenance
+from plot_cache import plot_cache
+from profiling import PROFILE_FORMATS, PROFILE_NAME, request_profiler
+from response_cache import cached_page, response_cache
+from services.availability_service import get_fleet_with_availability
 from services.auth_service import authenticate_user, register_user
-from services.booking_service import process_booking, update_booking_status
-from services.car_service import create_car, update_car, delete_car
+from services.booking_index import booking_index
+from services.booking_service import process_booking, update_booking_status as change_booking_status
+from services.car_service import create_car, update_car, delete_car as remove_car
+from services.export_service import EXPORT_FILTER_KEYS, EXPORT_FORMATS, EXPORTS, stream_export
+from services.image_service import car_image_sources
+from services.import_service import import_records
+from services.listing_service import list_active_trips, list_bookings, list_cars, list_maintenance, list_users
+from services.occupancy_service import occupancy_snapshot
+from services.password_hasher import password_hasher
+from services.query_options import dashboard_options
 from services.ranking_service import calculate_popular_cars
-from services.review_service import create_review
-from services.statistics_service import get_statistics_context
-from enums import UserRole, BookingStatus, CarStatus
+from services.review_service import create_review, get_review_page
+from services.statistics_service import get_statistics_context, get_chart_data
+from services.user_cache import principal_cache
+from enums import UserRole
 
 app = Flask(__name__)
 load_dotenv()
@@ -21,14 +37,80 @@ load_dotenv()
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.secret_key = os.getenv('SECRET_KEY')
+app.config['BOOKING_OVERLAP_BACKEND'] = os.getenv('BOOKING_OVERLAP_BACKEND', 'sql')
+app.config['BOOKING_RESERVATION_MODE'] = os.getenv('BOOKING_RESERVATION_MODE', 'default')
+app.config['BOOKING_LOCK_TIMEOUT_MS'] = int(os.getenv('BOOKING_LOCK_TIMEOUT_MS', 50))
+app.config['REVIEWS_PAGE_SIZE'] = int(os.getenv('REVIEWS_PAGE_SIZE', 10))
+app.config['BOOKING_INDEX_TTL'] = int(os.getenv('BOOKING_INDEX_TTL', 60))
+booking_index.ttl = app.config['BOOKING_INDEX_TTL']
+app.config['MANAGE_PAGE_SIZE'] = int(os.getenv('MANAGE_PAGE_SIZE', 50))
+app.config['MANAGE_MAX_PAGE_SIZE'] = int(os.getenv('MANAGE_MAX_PAGE_SIZE', 200))
+app.config['USER_CACHE_TTL'] = int(os.getenv('USER_CACHE_TTL', 60))
+principal_cache.ttl = app.config['USER_CACHE_TTL']
+app.config['USER_CACHE_SYNC_INTERVAL'] = float(os.getenv('USER_CACHE_SYNC_INTERVAL', 5))
+principal_cache.sync_interval = app.config['USER_CACHE_SYNC_INTERVAL']
+app.config['OCCUPANCY_TTL'] = int(os.getenv('OCCUPANCY_TTL', 30))
+occupancy_snapshot.ttl = app.config['OCCUPANCY_TTL']
+app.config['PLOT_CACHE_SIZE'] = int(os.getenv('PLOT_CACHE_SIZE', 64))
+app.config['PLOT_CACHE_DIR'] = os.getenv('PLOT_CACHE_DIR')
+plot_cache.configure(max_entries=app.config['PLOT_CACHE_SIZE'], disk_dir=app.config['PLOT_CACHE_DIR'])
+app.config['CHART_MAX_AGE'] = int(os.getenv('CHART_MAX_AGE', 300))
+app.config['SLOW_REQUEST_THRESHOLD'] = float(os.getenv('SLOW_REQUEST_THRESHOLD', 1.0))
+request_metrics.slow_threshold = app.config['SLOW_REQUEST_THRESHOLD']
+app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR', os.path.join(app.instance_path, 'profiles'))
+app.config['PROFILE_MAX_FILES'] = int(os.getenv('PROFILE_MAX_FILES', 50))
+app.config['PROFILE_SAMPLE_RATE'] = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+app.config['PROFILE_ENDPOINT'] = os.getenv('PROFILE_ENDPOINT')
+app.config['PROFILE_FORMAT'] = os.getenv('PROFILE_FORMAT', 'pstats')
+app.config['CAR_AVAILABILITY_SOURCE'] = os.getenv('CAR_AVAILABILITY_SOURCE', 'bookings')
+app.config['BOOKING_LIFECYCLE_INTERVAL'] = int(os.getenv('BOOKING_LIFECYCLE_INTERVAL', 0))
+app.config['BOOKING_LIFECYCLE_BATCH_SIZE'] = int(os.getenv('BOOKING_LIFECYCLE_BATCH_SIZE', 500))
+app.config['EXPORT_BATCH_SIZE'] = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+app.config['IMPORT_CHUNK_SIZE'] = int(os.getenv('IMPORT_CHUNK_SIZE', 500))
+app.config['RESPONSE_CACHE_SIZE'] = int(os.getenv('RESPONSE_CACHE_SIZE', 256))
+app.config['RESPONSE_CACHE_TTL'] = int(os.getenv('RESPONSE_CACHE_TTL', 60))
+response_cache.max_entries = app.config['RESPONSE_CACHE_SIZE']
+response_cache.ttl = app.config['RESPONSE_CACHE_TTL']
+app.config['STATIC_IMMUTABLE_MAX_AGE'] = int(os.getenv('STATIC_IMMUTABLE_MAX_AGE', 31536000))
+asset_manifest.configure(app.static_folder)
+app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+app.config['PASSWORD_HASH_ITERATIONS'] = int(os.getenv('PASSWORD_HASH_ITERATIONS', 0)) or None
+app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+app.config['PASSWORD_HASH_QUEUE'] = int(os.getenv('PASSWORD_HASH_QUEUE', 16))
+app.config['PASSWORD_HASH_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_TIMEOUT', 5))
+password_hasher.configure(
+    method=app.config['PASSWORD_HASH_METHOD'],
+    iterations=app.config['PASSWORD_HASH_ITERATIONS'],
+    max_workers=app.config['PASSWORD_HASH_WORKERS'],
+    max_pending=app.config['PASSWORD_HASH_QUEUE'],
+    timeout=app.config['PASSWORD_HASH_TIMEOUT']
+)
 
 db.init_app(app)
+request_metrics.init_app(app)
+request_metrics.add_gauge('app_plot_cache', 'Статистика кешу графіків.', plot_cache.stats)
+request_metrics.add_gauge('app_principal_cache', 'Статистика кешу користувачів.', principal_cache.stats)
+request_metrics.add_gauge('app_response_cache', 'Статистика кешу сторінок.', response_cache.stats)
+request_profiler.init_app(app, app.config['PROFILE_DIR'], app.config['PROFILE_MAX_FILES'])
+request_profiler.configure(app.config['PROFILE_SAMPLE_RATE'], app.config['PROFILE_ENDPOINT'], app.config['PROFILE_FORMAT'],
+                           persist=False)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
+register_commands(app)
+app.add_template_global(car_image_sources)
+app.add_template_global(asset_manifest.url, 'asset_url')
+
+def serve_static(filename):
+    return send_asset(app.static_folder, filename, app.config['STATIC_IMMUTABLE_MAX_AGE'])
+
+app.view_functions['static'] = serve_static
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    principal = principal_cache.get(int(user_id))
+    if principal and principal.is_blocked:
+        return None
+    return principal
 
 def role_required(roles):
     def decorator(f):
@@ -41,15 +123,19 @@ def role_required(roles):
         return decorated_function
     return decorator
 
+def paginated(list_function):
+    try:
+        per_page = int(request.args.get('per_page', app.config['MANAGE_PAGE_SIZE']))
+        per_page = max(1, min(per_page, app.config['MANAGE_MAX_PAGE_SIZE']))
+        return list_function(request.args, per_page, with_total=request.args.get('with_total') == '1')
+    except ValueError:
+        abort(400)
+
 @app.route('/')
+@cached_page
 def index():
     try:
-
-        
-        all_cars = Car.query.all()
-        all_reviews = Review.query.all()
-        
-        popular_cars = calculate_popular_cars(all_cars, all_reviews, limit=4)
+        popular_cars = calculate_popular_cars(limit=4)
     except Exception as e:
         print(f"Помилка при розрахунку популярних автомобілів: {e}")
         popular_cars = Car.query.limit(4).all()
@@ -57,37 +143,34 @@ def index():
     return render_template('index.html', cars=popular_cars)
 
 @app.route('/cars')
+@cached_page
 def cars():
     class_filter = request.args.get('class')
-    query = Car.query.filter(Car.status != CarStatus.MAINTENANCE.value) 
-    
-    if class_filter and class_filter != 'Всі':
-        query = query.filter_by(car_class=class_filter)
-        
-    all_cars = query.all()
-    
-    today = datetime.now().date()
-    for car in all_cars:
-        active_booking = Booking.query.filter(
-            Booking.car_id == car.id,
-            Booking.status == BookingStatus.CONFIRMED.value,
-            Booking.start_date <= today,
-            Booking.end_date >= today
-        ).first()
-        car.is_booked_now = True if active_booking else False
+    all_cars = get_fleet_with_availability(class_filter)
     
     return render_template('fleet.html', cars=all_cars, current_filter=class_filter)
 
 @app.route('/car/<int:car_id>')
+@cached_page
 def car_details(car_id):
     car = Car.query.get_or_404(car_id)
     
-    reviews = Review.query.filter_by(car_id=car.id).order_by(Review.created_at.desc()).all()
-    avg_rating = 0
-    if reviews:
-        avg_rating = round(sum(r.rating for r in reviews) / len(reviews), 1)
+    reviews, next_cursor = get_review_page(car.id, limit=app.config['REVIEWS_PAGE_SIZE'])
+    review_count = car.rating.review_count if car.rating else 0
+    avg_rating = round(car.rating.average, 1) if car.rating else 0
         
-    return render_template('car_details.html', car=car, reviews=reviews, avg_rating=avg_rating)
+    return render_template('car_details.html', car=car, reviews=reviews, next_cursor=next_cursor,
+                           avg_rating=avg_rating, review_count=review_count)
+
+@app.route('/car/<int:car_id>/reviews')
+@cached_page
+def car_reviews(car_id):
+    try:
+        reviews, next_cursor = get_review_page(car_id, request.args.get('cursor'),
+                                               limit=app.config['REVIEWS_PAGE_SIZE'])
+    except ValueError:
+        abort(400)
+    return render_template('review_list.html', car_id=car_id, reviews=reviews, next_cursor=next_cursor)
 
 @app.route('/booking/<int:car_id>', methods=['GET', 'POST'])
 def booking(car_id):
@@ -161,7 +244,7 @@ def logout():
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    bookings = Booking.query.filter_by(user_id=current_user.id).order_by(Booking.start_date.desc()).all()
+    bookings = Booking.query.options(*dashboard_options()).filter_by(user_id=current_user.id).order_by(Booking.start_date.desc()).all()
     return render_template('dashboard.html', bookings=bookings)
 
 @app.route('/review/add/<int:booking_id>', methods=['POST'])
@@ -182,8 +265,8 @@ def add_review(booking_id):
 @login_required
 @role_required([UserRole.ADMIN.value, UserRole.MANAGER.value])
 def manage_cars():
-    cars = Car.query.all()
-    return render_template('manage_cars.html', cars=cars)
+    page = paginated(list_cars)
+    return render_template('manage_cars.html', cars=page.items, page=page)
 
 app.config['UPLOAD_FOLDER'] = 'static/uploads/cars'
 if not os.path.exists(app.config['UPLOAD_FOLDER']):
@@ -226,13 +309,10 @@ def edit_car(car_id):
 @login_required
 @role_required([UserRole.MANAGER.value])
 def manage_bookings():
-    filter_status = request.args.get('status')
-    if filter_status:
-        bookings = Booking.query.filter_by(status=filter_status).order_by(Booking.start_date.desc()).all()
-    else:
-        bookings = Booking.query.order_by(Booking.start_date.desc()).all()
+    page = paginated(list_bookings)
     today = datetime.now().date()
-    return render_template('manage_bookings.html', bookings=bookings, today=today)
+    return render_template('manage_bookings.html', bookings=page.items, page=page,
+                           active_bookings=list_active_trips(today), today=today)
 
 @app.route('/manage/booking/update/<int:booking_id>/<action>')
 @login_required
@@ -240,7 +320,7 @@ def manage_bookings():
 def update_booking_status(booking_id, action):
     booking = Booking.query.get_or_404(booking_id)
 
-    success, message, category = update_booking_status(booking, action)
+    success, message, category = change_booking_status(booking, action)
     flash(message, category)
     
     db.session.commit()
@@ -250,8 +330,28 @@ def update_booking_status(booking_id, action):
 @login_required
 @role_required([UserRole.ADMIN.value])
 def manage_users():
-    users = User.query.order_by(User.id).all()
-    return render_template('manage_users.html', users=users)
+    page = paginated(list_users)
+    return render_template('manage_users.html', users=page.items, page=page)
+
+@app.route('/manage/import', methods=['GET', 'POST'])
+@login_required
+@role_required([UserRole.ADMIN.value])
+def import_data():
+    result = None
+    if request.method == 'POST':
+        file = request.files.get('file')
+        if not file or not file.filename:
+            flash('Оберіть файл для імпорту.', 'danger')
+            return render_template('import_data.html', result=None)
+
+        fmt = file.filename.rsplit('.', 1)[-1].lower()
+        try:
+            result = import_records(request.form.get('entity'), file.stream, fmt, app.config['IMPORT_CHUNK_SIZE'])
+            flash(f"Імпорт завершено: {result['imported']} рядків.", 'success')
+        except ValueError as e:
+            flash(str(e), 'danger')
+
+    return render_template('import_data.html', result=result)
 
 @app.route('/manage/user/<int:user_id>/role', methods=['POST'])
 @login_required
@@ -266,6 +366,7 @@ def update_user_role(user_id):
     if new_role in [role.value for role in UserRole]:
         user.role = new_role
         db.session.commit()
+        principal_cache.invalidate(user.id)
         flash(f'Роль для {user.username} оновлено на {new_role}.', 'success')
     else:
         flash('Вибрано недійсну роль.', 'danger')
@@ -288,6 +389,7 @@ def toggle_user_block(user_id, action):
         flash(f'Користувача {user.username} розблоковано.', 'success')
     
     db.session.commit()
+    principal_cache.invalidate(user.id)
     return redirect(url_for('manage_users'))
 
 @app.route('/manage/statistics')
@@ -296,22 +398,109 @@ def toggle_user_block(user_id, action):
 def statistics():
 
     context = get_statistics_context(request.args)
-    return render_template('statistics.html', **context)
+    export_args = {key: request.args[key] for key in EXPORT_FILTER_KEYS if key in request.args}
+    return render_template('statistics.html', export_args=export_args, **context)
+
+@app.route('/manage/metrics')
+@login_required
+@role_required([UserRole.ADMIN.value])
+def metrics():
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/manage/metrics/slow')
+@login_required
+@role_required([UserRole.ADMIN.value])
+def slow_requests():
+    return jsonify(request_metrics.slow_log())
+
+@app.route('/manage/profiling', methods=['GET', 'POST'])
+@login_required
+@role_required([UserRole.ADMIN.value])
+def profiling():
+    if request.method == 'POST':
+        try:
+            if request.form.get('action') == 'disable':
+                request_profiler.configure()
+                flash('Профілювання вимкнено.', 'success')
+            else:
+                request_profiler.configure(float(request.form.get('sample_rate') or 0),
+                                           request.form.get('endpoint'), request.form.get('format', 'pstats'))
+                flash('Налаштування профілювання оновлено.', 'success')
+        except ValueError as e:
+            flash(f'Помилка: {e}', 'danger')
+        return redirect(url_for('profiling'))
+
+    request_profiler.refresh(force=True)
+    endpoints = sorted({rule.endpoint for rule in app.url_map.iter_rules() if rule.endpoint != 'static'})
+    return render_template('profiling.html', profiler=request_profiler, endpoints=endpoints,
+                           formats=PROFILE_FORMATS, profiles=request_profiler.list_profiles())
+
+@app.route('/manage/profiling/<name>')
+@login_required
+@role_required([UserRole.ADMIN.value])
+def download_profile(name):
+    if not PROFILE_NAME.match(name):
+        abort(404)
+    return send_from_directory(request_profiler.profile_dir, name, as_attachment=True)
+
+@app.route('/manage/export/<dataset>.<fmt>')
+@login_required
+@role_required([UserRole.ADMIN.value])
+def export_data(dataset, fmt):
+    if dataset not in EXPORTS or fmt not in EXPORT_FORMATS:
+        abort(404)
+
+    try:
+        chunks = stream_export(dataset, fmt, request.args, app.config['EXPORT_BATCH_SIZE'])
+    except ValueError:
+        abort(400)
+    except ImportError:
+        abort(503)
+
+    response = Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename={dataset}.{fmt}'
+    return response
+
+@app.route('/manage/statistics/chart/<kind>.<fmt>')
+@login_required
+@role_required([UserRole.ADMIN.value])
+def statistics_chart(kind, fmt):
+    try:
+        from plotting import CHART_FORMATS, CHART_GENERATORS, chart_etag, render_chart
+    except ImportError:
+        abort(503)
+
+    if fmt not in CHART_FORMATS or kind not in CHART_GENERATORS:
+        abort(404)
+
+    data = get_chart_data(kind, request.args)
+    if data is None:
+        abort(404)
+
+    etag = chart_etag(kind, data, fmt)
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        image = render_chart(kind, data, fmt)
+        if image is None:
+            abort(503)
+        response = app.response_class(image, mimetype=CHART_FORMATS[fmt])
+
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = app.config['CHART_MAX_AGE']
+    return response
 
 @app.route('/manage/maintenance')
 @login_required
 @role_required([UserRole.ADMIN.value, UserRole.MANAGER.value])
 def manage_maintenance():
     car_id = request.args.get('car_id')
-    if car_id:
-        records = Maintenance.query.filter_by(car_id=car_id).order_by(Maintenance.date.desc()).all()
-        selected_car = Car.query.get(car_id)
-    else:
-        records = Maintenance.query.order_by(Maintenance.date.desc()).all()
-        selected_car = None
+    page = paginated(list_maintenance)
+    selected_car = Car.query.get(car_id) if car_id else None
     
     cars = Car.query.all()
-    return render_template('manage_maintenance.html', records=records, cars=cars, selected_car=selected_car)
+    return render_template('manage_maintenance.html', records=page.items, page=page, cars=cars, selected_car=selected_car)
 
 @app.route('/manage/maintenance/add', methods=['GET', 'POST'])
 @login_required
@@ -360,7 +549,7 @@ def delete_maintenance(record_id):
 def delete_car(car_id):
     car = Car.query.get_or_404(car_id)
 
-    success, message = delete_car(car)
+    success, message = remove_car(car)
     flash('Автомобіль успішно видалено!', 'success' if success else 'danger')
     return redirect(url_for('manage_cars'))
 
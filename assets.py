@@ -0,0 +1,114 @@
+from threading import Lock
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from flask import request, send_from_directory, url_for
+from services.image_service import HASHED_NAME, UPLOAD_PREFIX, VARIANT_NAME
+
+ASSET_DIRS = ('css', 'js')
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+COMPRESSIBLE_TYPES = ('text/css', 'text/javascript', 'application/javascript', 'image/svg+xml')
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def fingerprint(path, data):
+    root, ext = os.path.splitext(path)
+    return f'{root}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+
+def _compress(path, data):
+    written = ['gzip']
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        return written
+    with open(path + '.br', 'wb') as f:
+        f.write(brotli.compress(data, quality=11))
+    written.append('br')
+    return written
+
+def build_assets(static_folder):
+    dist_folder = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist_folder, ignore_errors=True)
+    manifest = {}
+    encodings = set()
+
+    for asset_dir in ASSET_DIRS:
+        for root, _, names in os.walk(os.path.join(static_folder, asset_dir)):
+            for name in sorted(names):
+                source = os.path.join(root, name)
+                filename = os.path.relpath(source, static_folder).replace(os.sep, '/')
+                with open(source, 'rb') as f:
+                    data = f.read()
+
+                hashed = fingerprint(filename, data)
+                target = os.path.join(dist_folder, hashed)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, 'wb') as f:
+                    f.write(data)
+                if mimetypes.guess_type(filename)[0] in COMPRESSIBLE_TYPES:
+                    encodings.update(_compress(target, data))
+                manifest[filename] = f'{DIST_DIR}/{hashed}'
+
+    with open(os.path.join(dist_folder, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest, sorted(encodings)
+
+class AssetManifest:
+    def __init__(self):
+        self.static_folder = None
+        self._entries = None
+        self._lock = Lock()
+
+    def configure(self, static_folder):
+        with self._lock:
+            self.static_folder = static_folder
+            self._entries = None
+
+    def _load(self):
+        with self._lock:
+            if self._entries is None:
+                try:
+                    with open(os.path.join(self.static_folder, DIST_DIR, MANIFEST_NAME)) as f:
+                        self._entries = json.load(f)
+                except (OSError, ValueError):
+                    self._entries = {}
+            return self._entries
+
+    def url(self, filename):
+        return url_for('static', filename=self._load().get(filename, filename))
+
+asset_manifest = AssetManifest()
+
+def is_immutable(filename):
+    if filename.startswith(DIST_DIR + '/'):
+        return filename != f'{DIST_DIR}/{MANIFEST_NAME}'
+    if filename.startswith(UPLOAD_PREFIX):
+        name = filename[len(UPLOAD_PREFIX):]
+        return bool(HASHED_NAME.match(name) or VARIANT_NAME.match(name))
+    return False
+
+def send_asset(static_folder, filename, max_age):
+    if not is_immutable(filename):
+        return send_from_directory(static_folder, filename)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response = None
+    for encoding, suffix in ENCODINGS:
+        if encoding in request.accept_encodings and os.path.isfile(os.path.join(static_folder, filename + suffix)):
+            response = send_from_directory(static_folder, filename + suffix, mimetype=mimetype, max_age=max_age)
+            response.headers['Content-Encoding'] = encoding
+            break
+    if response is None:
+        response = send_from_directory(static_folder, filename, max_age=max_age)
+
+    if mimetype in COMPRESSIBLE_TYPES:
+        response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from werkzeug.datastructures import MultiDict
+from models import db, Booking, Car, Location, Maintenance, Review, User
+from plot_cache import plot_cache
+from response_cache import response_cache
+from services.booking_index import booking_index
+from services.booking_service import process_booking
+from services.occupancy_service import occupancy_snapshot
+from services.ranking_service import calculate_popular_cars
+from services.statistics_service import get_chart_data, get_statistics_context
+
+PERIODS = ['week', '2weeks', 'month', '3months', '6months', 'year']
+
+def measure(func, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        'runs': repeat,
+        'min_ms': round(timings[0], 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'max_ms': round(timings[-1], 3)
+    }
+
+def dataset_size():
+    return {
+        'locations': Location.query.count(),
+        'cars': Car.query.count(),
+        'users': User.query.count(),
+        'bookings': Booking.query.count(),
+        'reviews': Review.query.count(),
+        'maintenance': Maintenance.query.count()
+    }
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _invalidate_caches():
+    response_cache.bump()
+    occupancy_snapshot.invalidate()
+    db.session.expire_all()
+
+def _view_cases(app):
+    client = app.test_client()
+
+    def get(url):
+        def run():
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f'{url}: {response.status_code}')
+        return run
+
+    cases = {
+        'cars': (get('/cars'), _invalidate_caches),
+        'cars_cached': (get('/cars'), None),
+        'index': (get('/'), _invalidate_caches),
+        'index_cached': (get('/'), None),
+        'calculate_popular_cars': (lambda: calculate_popular_cars(limit=4), _invalidate_caches)
+    }
+    for car_class in ['Economy', 'SUV']:
+        cases[f'cars?class={car_class}'] = (get(f'/cars?class={car_class}'), _invalidate_caches)
+    return cases
+
+def _booking_case(seed):
+    rng = random.Random(seed)
+    car_ids = [row.id for row in db.session.query(Car.id)]
+    today = datetime.now().date()
+    results = {'success': 0, 'rejected': 0}
+    created = []
+
+    def run():
+        start = today + timedelta(days=rng.randint(400, 800))
+        form = {
+            'start_date': start.strftime('%Y-%m-%d'),
+            'end_date': (start + timedelta(days=rng.randint(1, 7))).strftime('%Y-%m-%d'),
+            'name': 'Benchmark',
+            'phone': '+380000000000'
+        }
+        success, booking = process_booking(None, db.session.get(Car, rng.choice(car_ids)), form)
+        results['success' if success else 'rejected'] += 1
+        if success:
+            created.append(booking.id)
+
+    def cleanup():
+        Booking.query.filter(Booking.id.in_(created)).delete(synchronize_session=False)
+        db.session.commit()
+        booking_index.invalidate()
+        _invalidate_caches()
+
+    return run, results, cleanup
+
+def _statistics_cases():
+    cases = {}
+    for period in PERIODS:
+        args = MultiDict({'period': period})
+        cases[f'get_statistics_context[{period}]'] = (lambda args=args: get_statistics_context(args), _invalidate_caches)
+        cases[f'income_series[{period}]'] = (lambda args=args: get_chart_data('income', args), None)
+    return cases
+
+def _plot_cases():
+    from plotting import render_chart
+
+    maintenance_car = db.session.query(Maintenance.car_id).first()
+    charts = [
+        ('income', MultiDict({'period': 'year'})),
+        ('maintenance_summary', MultiDict()),
+        ('maintenance', MultiDict({'maintenance_car_id': str(maintenance_car.car_id) if maintenance_car else 'all'}))
+    ]
+    cases = {}
+    for kind, args in charts:
+        data = get_chart_data(kind, args)
+        if data is None:
+            continue
+        cases[f'plot[{kind}]'] = (lambda kind=kind, data=data: render_chart(kind, data), plot_cache.clear)
+        cases[f'plot[{kind}]_cached'] = (lambda kind=kind, data=data: render_chart(kind, data), None)
+    return cases
+
+def run_benchmarks(app, repeat=20, include_plots=True, seed=42):
+    cases = {}
+    cases.update(_view_cases(app))
+    cases.update(_statistics_cases())
+    if include_plots:
+        cases.update(_plot_cases())
+
+    results = {}
+    for name, (func, setup) in cases.items():
+        func()
+        results[name] = measure(func, repeat, setup)
+
+    book, outcome, cleanup = _booking_case(seed)
+    try:
+        results['process_booking'] = measure(book, repeat)
+        results['process_booking'].update(outcome)
+    finally:
+        cleanup()
+
+    return {
+        'commit': current_commit(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'database': db.engine.dialect.name,
+        'dataset': dataset_size(),
+        'results': results
+    }
+
+def write_results(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
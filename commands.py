@@ -0,0 +1,379 @@
+from datetime import datetime, timedelta
+from threading import Lock, Thread
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+import click
+from flask import url_for
+
+from assets import build_assets
+from benchmarks import run_benchmarks, write_results
+from models import db, Car, Booking, User
+from enums import BookingStatus, UserRole
+from load_test import load_fixtures, reset_load_test_data, run_load_test, wait_for_server
+from migrations import MIGRATIONS, explain, get_current_version, upgrade
+from query_counter import assert_page_queries
+from scheduler import PeriodicJob
+from services.availability_service import booked_car_ids_query, get_fleet_query
+from services.booking_lifecycle import run_booking_lifecycle
+from services.booking_service import overlapping_bookings_query, process_booking
+from services.car_service import allowed_file
+from services.export_service import EXPORT_FORMATS, EXPORTS, stream_export
+from services.image_service import UPLOAD_PREFIX, VARIANT_NAME, store_image
+from services.import_service import IMPORTERS, import_records
+from services.password_hasher import password_hasher
+from services.ranking_service import rebuild_rating_aggregates, find_rating_mismatches
+from services.rollup_service import rebuild_daily_rollup
+from synthetic_data import generate_dataset
+
+QUERY_BUDGETS = [
+    ('/dashboard', UserRole.USER.value, 3),
+    ('/manage/bookings', UserRole.MANAGER.value, 3),
+    ('/manage/maintenance', UserRole.MANAGER.value, 4)
+]
+
+def hot_queries():
+    today = datetime.now().date()
+    fleet_query = get_fleet_query('Economy')
+    return [
+        ('overlap', overlapping_bookings_query(1, today, today + timedelta(days=3)), 'ix_bookings_car_status_dates'),
+        ('fleet', fleet_query, 'ix_cars_status_class_location'),
+        ('booked_now', booked_car_ids_query(fleet_query, today), 'ix_bookings_car_status_dates')
+    ]
+
+def register_commands(app):
+
+    @app.cli.command('booking-stress')
+    @click.option('--threads', default=8, help='Кількість паралельних потоків.')
+    @click.option('--attempts', default=25, help='Кількість спроб бронювання на потік.')
+    @click.option('--days', default=30, help='Діапазон дат для випадкових бронювань.')
+    def booking_stress(threads, attempts, days):
+        car = Car(brand='Stress', model='Test', year=2000, price_per_day=1,
+                  transmission='Auto', fuel_type='Petrol', seats=4)
+        db.session.add(car)
+        db.session.commit()
+        car_id = car.id
+
+        results = {'success': 0, 'rejected': 0}
+        results_lock = Lock()
+        today = datetime.now().date()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            with app.app_context():
+                for _ in range(attempts):
+                    start = today + timedelta(days=rng.randint(1, days))
+                    end = start + timedelta(days=rng.randint(1, 5))
+                    form = {
+                        'start_date': start.strftime('%Y-%m-%d'),
+                        'end_date': end.strftime('%Y-%m-%d'),
+                        'name': 'Stress Test',
+                        'phone': '+380000000000'
+                    }
+                    success, _ = process_booking(None, db.session.get(Car, car_id), form)
+                    with results_lock:
+                        results['success' if success else 'rejected'] += 1
+                    db.session.remove()
+
+        workers = [Thread(target=worker, args=(seed,)) for seed in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        bookings = Booking.query.filter(
+            Booking.car_id == car_id,
+            Booking.status.notin_([BookingStatus.CANCELED.value, BookingStatus.COMPLETED.value])
+        ).order_by(Booking.start_date).all()
+        double_bookings = sum(
+            1 for previous, current in zip(bookings, bookings[1:])
+            if current.start_date < previous.end_date
+        )
+
+        total = threads * attempts
+        click.echo(f"Режим: {app.config.get('BOOKING_RESERVATION_MODE')}")
+        click.echo(f"Спроб: {total}, успішних: {results['success']}, відхилених: {results['rejected']}")
+        click.echo(f"Пропускна здатність: {total / elapsed:.1f} запитів/с")
+        click.echo(f"Подвійних бронювань: {double_bookings}")
+
+        Booking.query.filter_by(car_id=car_id).delete()
+        db.session.delete(db.session.get(Car, car_id))
+        db.session.commit()
+
+        if double_bookings:
+            raise SystemExit(1)
+
+    @app.cli.command('rebuild-ratings')
+    def rebuild_ratings():
+        count = rebuild_rating_aggregates()
+        click.echo(f'Агрегати рейтингів перераховано для {count} авто.')
+
+    @app.cli.command('check-ratings')
+    def check_ratings():
+        mismatches = find_rating_mismatches()
+        for car_id, saved, actual in mismatches:
+            click.echo(f'Авто #{car_id}: збережено {saved}, фактично {actual}')
+        if mismatches:
+            raise SystemExit(1)
+        click.echo('Агрегати рейтингів узгоджені.')
+
+    @app.cli.command('rebuild-rollup')
+    def rebuild_rollup():
+        count = rebuild_daily_rollup()
+        click.echo(f'Денний зведений звіт перебудовано: {count} рядків.')
+
+    @app.cli.command('check-query-budgets')
+    def check_query_budgets():
+        failed = False
+        for url, role, limit in QUERY_BUDGETS:
+            user = User.query.filter_by(role=role).first()
+            if not user:
+                click.echo(f'{url}: немає користувача з роллю {role}, пропущено')
+                continue
+
+            try:
+                counter = assert_page_queries(app, db.engine, url, user.id, limit)
+                click.echo(f'{url}: {counter.count}/{limit} запитів')
+            except AssertionError as e:
+                failed = True
+                click.echo(f'{url}: {e}')
+
+        if failed:
+            raise SystemExit(1)
+
+    @app.cli.command('db-upgrade')
+    def db_upgrade():
+        applied = upgrade()
+        for version, description in applied:
+            click.echo(f'Застосовано міграцію {version}: {description}')
+        click.echo(f'Поточна версія схеми: {get_current_version()} з {len(MIGRATIONS)}')
+
+    @app.cli.command('explain-hot-queries')
+    def explain_hot_queries():
+        missing = []
+        for name, query, index_name in hot_queries():
+            plan = explain(query)
+            used = index_name in plan
+            click.echo(f"{name}: {'використовує' if used else 'НЕ використовує'} {index_name}")
+            click.echo(plan)
+            if not used:
+                missing.append(name)
+        if missing:
+            raise SystemExit(1)
+
+    @app.cli.command('bench-password-hashing')
+    @click.option('--threads', default=8, help='Кількість паралельних потоків.')
+    @click.option('--logins', default=20, help='Кількість входів на потік.')
+    def bench_password_hashing(threads, logins):
+        password_hash = password_hasher.hash('benchmark-password')
+        latencies = []
+        latencies_lock = Lock()
+
+        def worker():
+            for _ in range(logins):
+                started = time.perf_counter()
+                password_hasher.verify(password_hash, 'benchmark-password')
+                with latencies_lock:
+                    latencies.append(time.perf_counter() - started)
+
+        workers = [Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        cores = os.cpu_count() or 1
+        throughput = len(latencies) / elapsed
+        click.echo(f'Метод: {password_hasher.method}')
+        click.echo(f'Входів: {len(latencies)}, потоків: {threads}, ядер: {cores}')
+        click.echo(f'Пропускна здатність: {throughput:.1f} входів/с, {throughput / cores:.1f} входів/с на ядро')
+        click.echo(f'Медіана: {latencies[len(latencies) // 2] * 1000:.1f} мс, максимум: {latencies[-1] * 1000:.1f} мс')
+
+    @app.cli.command('process-car-images')
+    def process_car_images():
+        upload_folder = app.config['UPLOAD_FOLDER']
+        processed = 0
+        renamed = 0
+        for name in sorted(os.listdir(upload_folder)):
+            if VARIANT_NAME.match(name) or not allowed_file(name):
+                continue
+
+            path = os.path.join(upload_folder, name)
+            with open(path, 'rb') as f:
+                filename = store_image(f.read(), name.rsplit('.', 1)[1].lower(), upload_folder, background=False)
+            processed += 1
+            if filename == name:
+                continue
+
+            with app.test_request_context():
+                old_url = url_for('static', filename=f'{UPLOAD_PREFIX}{name}')
+                new_url = url_for('static', filename=f'{UPLOAD_PREFIX}{filename}')
+            renamed += Car.query.filter_by(image_url=old_url).update({'image_url': new_url})
+            db.session.commit()
+            os.remove(path)
+
+        click.echo(f'Оброблено зображень: {processed}, оновлено посилань авто: {renamed}')
+
+    @app.cli.command('build-assets')
+    def build_static_assets():
+        manifest, encodings = build_assets(app.static_folder)
+        for filename, hashed in sorted(manifest.items()):
+            click.echo(f'{filename} -> {hashed}')
+        click.echo(f"Стиснення: {', '.join(encodings)}")
+
+    @app.cli.command('import-data')
+    @click.argument('entity', type=click.Choice(sorted(IMPORTERS)))
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Формат файлу (за замовчуванням з розширення).')
+    @click.option('--chunk-size', default=None, type=int, help='Кількість рядків в одній транзакції.')
+    def import_data(entity, path, fmt, chunk_size):
+        fmt = fmt or path.rsplit('.', 1)[-1].lower()
+        try:
+            with open(path, 'rb') as stream:
+                result = import_records(entity, stream, fmt, chunk_size or app.config['IMPORT_CHUNK_SIZE'])
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        for line, message in result['errors']:
+            click.echo(f'Рядок {line}: {message}')
+        click.echo(f"Імпортовано: {result['imported']}, помилок: {len(result['errors'])}")
+        if result['errors']:
+            raise SystemExit(1)
+
+    @app.cli.command('export-data')
+    @click.argument('dataset', type=click.Choice(sorted(EXPORTS)))
+    @click.argument('fmt', type=click.Choice(sorted(EXPORT_FORMATS)))
+    @click.option('--output', '-o', type=click.Path(dir_okay=False), required=True, help='Файл для запису.')
+    @click.option('--period', default='month', help='Період, як у статистиці.')
+    @click.option('--location-id', default=None, help='Фільтр за локацією.')
+    @click.option('--car-class', default=None, help='Фільтр за класом авто.')
+    @click.option('--batch-size', default=None, type=int, help='Розмір пакета серверного курсора.')
+    def export_data(dataset, fmt, output, period, location_id, car_class, batch_size):
+        filters = {'period': period, 'location_id': location_id, 'car_class': car_class}
+        written = 0
+        with open(output, 'wb') as f:
+            for chunk in stream_export(dataset, fmt, filters, batch_size or app.config['EXPORT_BATCH_SIZE']):
+                f.write(chunk)
+                written += len(chunk)
+        click.echo(f'Експортовано {dataset} у {output}: {written} байт')
+
+    @app.cli.command('generate-data')
+    @click.option('--locations', default=5, help='Кількість локацій.')
+    @click.option('--cars', default=200, help='Кількість автомобілів.')
+    @click.option('--users', default=500, help='Кількість користувачів.')
+    @click.option('--bookings', default=5000, help='Кількість бронювань.')
+    @click.option('--reviews', default=1500, help='Кількість відгуків.')
+    @click.option('--maintenance', default=1000, help='Кількість записів обслуговування.')
+    @click.option('--seed', default=42, help='Зерно генератора випадкових чисел.')
+    @click.option('--reset', is_flag=True, help='Очистити базу перед генерацією.')
+    def generate_data(locations, cars, users, bookings, reviews, maintenance, seed, reset):
+        if reset:
+            db.drop_all()
+            db.create_all()
+        started = time.perf_counter()
+        counts = generate_dataset(locations, cars, users, bookings, reviews, maintenance, seed)
+        for name, count in counts.items():
+            click.echo(f'{name}: {count}')
+        click.echo(f'Згенеровано за {time.perf_counter() - started:.1f} с')
+
+    @app.cli.command('bench')
+    @click.option('--repeat', default=20, help='Кількість вимірювань для кожного сценарію.')
+    @click.option('--output', '-o', type=click.Path(dir_okay=False), default='benchmark.json', help='Файл результатів.')
+    @click.option('--compare', type=click.Path(exists=True, dir_okay=False), help='Попередній файл результатів для порівняння.')
+    @click.option('--no-plots', is_flag=True, help='Пропустити побудову графіків.')
+    @click.option('--seed', default=42, help='Зерно для сценарію бронювання.')
+    def bench(repeat, output, compare, no_plots, seed):
+        report = run_benchmarks(app, repeat, include_plots=not no_plots, seed=seed)
+        write_results(report, output)
+
+        previous = {}
+        if compare:
+            with open(compare) as f:
+                previous = json.load(f)['results']
+
+        for name, stats in report['results'].items():
+            line = f"{name}: медіана {stats['median_ms']} мс, p95 {stats['p95_ms']} мс"
+            if name in previous:
+                change = (stats['median_ms'] - previous[name]['median_ms']) / previous[name]['median_ms'] * 100
+                line += f' ({change:+.1f}%)'
+            click.echo(line)
+        click.echo(f'Результати записано у {output}')
+
+    @app.cli.command('serve-workers')
+    @click.option('--host', default='127.0.0.1', help='Адреса для прослуховування.')
+    @click.option('--port', default=8000, help='Порт.')
+    @click.option('--workers', default=4, help='Кількість робочих процесів.')
+    def serve_workers(host, port, workers):
+        from werkzeug.serving import run_simple
+        run_simple(host, port, app, processes=workers, threaded=False)
+
+    @app.cli.command('load-test')
+    @click.option('--workers', default=4, help='Кількість робочих процесів WSGI-сервера.')
+    @click.option('--users', default=20, help='Кількість одночасних віртуальних користувачів.')
+    @click.option('--duration', default=30, help='Тривалість тесту в секундах.')
+    @click.option('--port', default=8765, help='Порт тестового сервера.')
+    @click.option('--server', type=click.Choice(['gunicorn', 'werkzeug']), default=None,
+                  help='WSGI-сервер (gunicorn, якщо встановлено).')
+    @click.option('--password', default='password', help='Пароль синтетичних користувачів.')
+    @click.option('--output', '-o', type=click.Path(dir_okay=False), help='Файл для JSON-звіту.')
+    @click.option('--seed', default=42, help='Зерно генератора сценаріїв.')
+    def load_test(workers, users, duration, port, server, password, output, seed):
+        server = server or ('gunicorn' if shutil.which('gunicorn') else 'werkzeug')
+        if server == 'gunicorn':
+            command = ['gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}', 'app:app']
+        else:
+            command = [sys.executable, '-m', 'flask', '--app', 'app', 'serve-workers',
+                       '--port', str(port), '--workers', str(workers)]
+
+        fixtures = load_fixtures(password)
+        db.session.remove()
+        base_url = f'http://127.0.0.1:{port}'
+        process = subprocess.Popen(command, cwd=app.root_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not wait_for_server(base_url):
+                raise click.ClickException('Сервер не запустився.')
+            report = run_load_test(base_url, fixtures, users, duration, seed)
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+            deleted, restored = reset_load_test_data(fixtures)
+            click.echo(f'Видалено тестових бронювань: {deleted}, відновлено статусів: {restored}')
+
+        report.update({'server': server, 'workers': workers, 'users': users})
+        for route, stats in report['routes'].items():
+            click.echo(f"{route}: {stats['requests']} запитів, {stats['throughput_rps']} запитів/с, "
+                       f"p50 {stats['p50_ms']} мс, p95 {stats['p95_ms']} мс, p99 {stats['p99_ms']} мс, "
+                       f"помилок {stats['error_rate'] * 100:.1f}%")
+        click.echo(f"Всього: {report['requests']} запитів, {report['throughput_rps']} запитів/с, "
+                   f"p50 {report['p50_ms']} мс, p95 {report['p95_ms']} мс, p99 {report['p99_ms']} мс, "
+                   f"помилок {report['error_rate'] * 100:.1f}% ({server}, {workers} процесів)")
+        if output:
+            with open(output, 'w') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+    @app.cli.command('sync-bookings')
+    @click.option('--batch-size', default=None, type=int, help='Кількість записів в одній транзакції.')
+    @click.option('--interval', default=None, type=int,
+                  help='Повторювати кожні N секунд (0 - один запуск, для cron).')
+    def sync_bookings(batch_size, interval):
+        batch_size = batch_size or app.config['BOOKING_LIFECYCLE_BATCH_SIZE']
+        interval = app.config['BOOKING_LIFECYCLE_INTERVAL'] if interval is None else interval
+
+        def report(result):
+            finalized, synced = result
+            click.echo(f'Завершено бронювань: {finalized}, оновлено статусів авто: {synced}')
+
+        job = PeriodicJob('booking-lifecycle', lambda: run_booking_lifecycle(batch_size=batch_size), interval)
+        try:
+            job.run(app, on_result=report)
+        except KeyboardInterrupt:
+            job.stop()
@@ -0,0 +1,230 @@
+from http.cookiejar import CookieJar
+from threading import Lock, Thread
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, build_opener
+from datetime import datetime, timedelta
+import random
+import time
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from models import db, Booking, Car, User
+from enums import BookingStatus, UserRole
+from services.availability_service import refresh_car_status
+from services.rollup_service import record_status_change
+
+PERIODS = ['week', '2weeks', 'month', '3months', '6months', 'year']
+JOURNEY_WEIGHTS = {'browse': 60, 'book': 20, 'manage': 10, 'statistics': 10}
+LOAD_TEST_CUSTOMER = 'Навантажувальний Тест'
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self._lock = Lock()
+
+    def record(self, route, elapsed, ok):
+        with self._lock:
+            self.latencies.setdefault(route, []).append(elapsed)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class VirtualUser:
+    def __init__(self, base_url, recorder, timeout=30):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.timeout = timeout
+        self.email = None
+        self.opener = build_opener(HTTPCookieProcessor(CookieJar()), _NoRedirect())
+
+    def request(self, route, path, data=None):
+        body = urlencode(data).encode('utf8') if data is not None else None
+        started = time.perf_counter()
+        try:
+            with self.opener.open(self.base_url + path, data=body, timeout=self.timeout) as response:
+                response.read()
+                status = response.status
+        except HTTPError as e:
+            e.read()
+            status = e.code
+        except (URLError, OSError):
+            status = None
+        self.recorder.record(route, time.perf_counter() - started, status is not None and status < 400)
+        return status
+
+    def login(self, email, password):
+        return self.request('POST /login', '/login', {'email': email, 'password': password})
+
+    def sign_in(self, emails, password, rng):
+        if self.email in emails:
+            return True
+        if self.email is not None:
+            self.request('GET /logout', '/logout')
+            self.email = None
+        email = rng.choice(emails)
+        if self.login(email, password) != 302:
+            return False
+        self.email = email
+        return True
+
+def load_fixtures(password):
+    def emails(role):
+        return [row.email for row in db.session.query(User.email).filter(
+            User.role == role, User.is_blocked.isnot(True)
+        ).limit(200)]
+
+    cars = db.session.query(Car.id, Car.car_class).all()
+    return {
+        'password': password,
+        'car_ids': [car.id for car in cars],
+        'car_classes': sorted({car.car_class for car in cars if car.car_class}),
+        'users': emails(UserRole.USER.value),
+        'managers': emails(UserRole.MANAGER.value),
+        'admins': emails(UserRole.ADMIN.value),
+        'max_booking_id': db.session.query(func.max(Booking.id)).scalar() or 0,
+        'new_bookings': [row.id for row in db.session.query(Booking.id).filter(
+            Booking.status == BookingStatus.NEW.value
+        ).order_by(Booking.id.desc()).limit(5000)]
+    }
+
+def browse_journey(user, rng, fixtures):
+    car_class = rng.choice(fixtures['car_classes'] + ['Всі'])
+    user.request('GET /cars', '/cars?' + urlencode({'class': car_class}))
+    car_id = rng.choice(fixtures['car_ids'])
+    user.request('GET /car/<id>', f'/car/{car_id}')
+    user.request('GET /car/<id>/reviews', f'/car/{car_id}/reviews')
+
+def book_journey(user, rng, fixtures):
+    if not user.sign_in(fixtures['users'], fixtures['password'], rng):
+        return
+    car_id = rng.choice(fixtures['car_ids'])
+    user.request('GET /booking/<id>', f'/booking/{car_id}')
+    start = datetime.now().date() + timedelta(days=rng.randint(1, 365))
+    user.request('POST /booking/<id>', f'/booking/{car_id}', {
+        'name': LOAD_TEST_CUSTOMER,
+        'phone': '+380501234567',
+        'start_date': start.strftime('%Y-%m-%d'),
+        'end_date': (start + timedelta(days=rng.randint(1, 7))).strftime('%Y-%m-%d')
+    })
+
+def manage_journey(user, rng, fixtures):
+    if not user.sign_in(fixtures['managers'], fixtures['password'], rng):
+        return
+    user.request('GET /manage/bookings', '/manage/bookings')
+    with fixtures['pending_lock']:
+        booking_id = fixtures['pending'].pop() if fixtures['pending'] else None
+    if booking_id:
+        user.request('GET /manage/booking/update/<id>/confirm', f'/manage/booking/update/{booking_id}/confirm')
+
+def statistics_journey(user, rng, fixtures):
+    if not user.sign_in(fixtures['admins'], fixtures['password'], rng):
+        return
+    period = rng.choice(PERIODS)
+    user.request('GET /manage/statistics', '/manage/statistics?' + urlencode({'period': period}))
+    user.request('GET /manage/statistics/chart/income.png',
+                 '/manage/statistics/chart/income.png?' + urlencode({'period': period}))
+
+def _available_journeys(fixtures):
+    journeys = {}
+    if fixtures['car_ids']:
+        journeys['browse'] = browse_journey
+        if fixtures['users']:
+            journeys['book'] = book_journey
+    if fixtures['managers']:
+        journeys['manage'] = manage_journey
+    if fixtures['admins']:
+        journeys['statistics'] = statistics_journey
+    return journeys
+
+def run_load_test(base_url, fixtures, users=10, duration=30, seed=42):
+    recorder = Recorder()
+    journeys = _available_journeys(fixtures)
+    names = list(journeys)
+    weights = [JOURNEY_WEIGHTS[name] for name in names]
+    fixtures = dict(fixtures, pending=list(fixtures['new_bookings']), pending_lock=Lock())
+    deadline = time.monotonic() + duration
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        user = VirtualUser(base_url, recorder)
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights)[0]
+            journeys[name](user, rng, fixtures)
+
+    threads = [Thread(target=worker, args=(index,)) for index in range(users)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return summarize(recorder, elapsed)
+
+def reset_load_test_data(fixtures, batch_size=500):
+    deleted = Booking.query.filter(
+        Booking.id > fixtures['max_booking_id'],
+        Booking.customer_name == LOAD_TEST_CUSTOMER
+    ).delete(synchronize_session=False)
+
+    restored = 0
+    booking_ids = fixtures['new_bookings']
+    for start in range(0, len(booking_ids), batch_size):
+        bookings = Booking.query.options(joinedload(Booking.car)).filter(
+            Booking.id.in_(booking_ids[start:start + batch_size]),
+            Booking.status == BookingStatus.CONFIRMED.value
+        ).all()
+        for booking in bookings:
+            booking.status = BookingStatus.NEW.value
+            record_status_change(booking, BookingStatus.CONFIRMED.value)
+            refresh_car_status(booking.car)
+        restored += len(bookings)
+    db.session.commit()
+    return deleted, restored
+
+def summarize(recorder, elapsed):
+    routes = {}
+    for route, latencies in sorted(recorder.latencies.items()):
+        errors = recorder.errors.get(route, 0)
+        routes[route] = {
+            'requests': len(latencies),
+            'throughput_rps': round(len(latencies) / elapsed, 2),
+            'error_rate': round(errors / len(latencies), 4),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 1)
+        }
+
+    all_latencies = [value for latencies in recorder.latencies.values() for value in latencies]
+    total_errors = sum(recorder.errors.values())
+    return {
+        'duration_s': round(elapsed, 2),
+        'requests': len(all_latencies),
+        'throughput_rps': round(len(all_latencies) / elapsed, 2) if elapsed else 0,
+        'error_rate': round(total_errors / len(all_latencies), 4) if all_latencies else 0,
+        'p50_ms': round(percentile(all_latencies, 0.50) * 1000, 1) if all_latencies else None,
+        'p95_ms': round(percentile(all_latencies, 0.95) * 1000, 1) if all_latencies else None,
+        'p99_ms': round(percentile(all_latencies, 0.99) * 1000, 1) if all_latencies else None,
+        'routes': routes
+    }
+
+def wait_for_server(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    opener = build_opener(_NoRedirect())
+    while time.monotonic() < deadline:
+        try:
+            with opener.open(base_url + '/', timeout=2) as response:
+                response.read()
+            return True
+        except HTTPError:
+            return True
+        except (URLError, OSError):
+            time.sleep(0.2)
+    return False
@@ -0,0 +1,192 @@
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from threading import Lock
+import time
+from flask import current_app, g, has_request_context, request, template_rendered, before_render_template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+MAX_CAPTURED_STATEMENTS = 200
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+
+    def inc(self, labels=(), amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(self._values.items()):
+            lines.append(f'{self.name}{_labels(self.label_names, labels)} {value}')
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, value, labels=()):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{self.name}_bucket{_labels(self.label_names, labels, [("le", "+Inf")])} {count}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, labels)} {total:.6f}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, labels)} {count}')
+        return lines
+
+class RequestMetrics:
+    def __init__(self, slow_threshold=1.0, slow_log_size=50):
+        self.slow_threshold = slow_threshold
+        self.slow_requests = deque(maxlen=slow_log_size)
+        self.gauges = {}
+        self._lock = Lock()
+        self.requests = Counter('app_requests_total', 'Кількість запитів.', ('endpoint', 'method', 'status'))
+        self.request_seconds = Histogram('app_request_duration_seconds', 'Тривалість запиту.', ('endpoint',))
+        self.sql_queries = Histogram('app_request_sql_queries', 'SQL-запитів на HTTP-запит.', ('endpoint',), COUNT_BUCKETS)
+        self.sql_seconds = Histogram('app_request_sql_seconds', 'Час SQL на HTTP-запит.', ('endpoint',))
+        self.template_seconds = Histogram('app_template_render_seconds', 'Час рендерингу шаблонів.', ('endpoint', 'template'))
+        self.plot_seconds = Histogram('app_plot_render_seconds', 'Час побудови графіків.', ('endpoint', 'kind'))
+        self.slow_total = Counter('app_slow_requests_total', 'Кількість повільних запитів.', ('endpoint',))
+
+    def init_app(self, app):
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        before_render_template.connect(self._before_template, app)
+        template_rendered.connect(self._after_template, app)
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def add_gauge(self, name, help_text, collect):
+        self.gauges[name] = (help_text, collect)
+
+    def _state(self):
+        if not has_request_context():
+            return None
+        return g.get('_request_metrics')
+
+    def _start_request(self):
+        g._request_metrics = {
+            'started': time.perf_counter(),
+            'sql_count': 0,
+            'sql_seconds': 0.0,
+            'statements': [],
+            'templates': []
+        }
+
+    def _before_template(self, sender, template, context, **extra):
+        state = self._state()
+        if state is not None:
+            state['templates'].append(time.perf_counter())
+
+    def _after_template(self, sender, template, context, **extra):
+        state = self._state()
+        if state is None or not state['templates']:
+            return
+        elapsed = time.perf_counter() - state['templates'].pop()
+        with self._lock:
+            self.template_seconds.observe(elapsed, (request.endpoint or 'unknown', template.name or 'string'))
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self._state() is not None:
+            conn.info.setdefault('_query_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        state = self._state()
+        started = conn.info.get('_query_started')
+        if state is None or not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        state['sql_count'] += 1
+        state['sql_seconds'] += elapsed
+        if len(state['statements']) < MAX_CAPTURED_STATEMENTS:
+            state['statements'].append((round(elapsed * 1000, 3), statement))
+
+    def observe_plot(self, kind, elapsed):
+        endpoint = request.endpoint if has_request_context() else None
+        with self._lock:
+            self.plot_seconds.observe(elapsed, (endpoint or 'unknown', kind))
+
+    def _finish_request(self, response):
+        state = self._state()
+        if state is None:
+            return response
+
+        elapsed = time.perf_counter() - state['started']
+        endpoint = request.endpoint or 'unknown'
+        with self._lock:
+            self.requests.inc((endpoint, request.method, str(response.status_code)))
+            self.request_seconds.observe(elapsed, (endpoint,))
+            self.sql_queries.observe(state['sql_count'], (endpoint,))
+            self.sql_seconds.observe(state['sql_seconds'], (endpoint,))
+            slow = elapsed >= self.slow_threshold
+            if slow:
+                self.slow_total.inc((endpoint,))
+                self.slow_requests.append({
+                    'at': datetime.now().isoformat(timespec='seconds'),
+                    'method': request.method,
+                    'path': request.full_path.rstrip('?'),
+                    'endpoint': endpoint,
+                    'status': response.status_code,
+                    'duration_ms': round(elapsed * 1000, 1),
+                    'sql_count': state['sql_count'],
+                    'sql_ms': round(state['sql_seconds'] * 1000, 1),
+                    'statements': state['statements']
+                })
+
+        if slow:
+            statements = '\n'.join(f'  {ms} мс: {statement}' for ms, statement in state['statements'])
+            current_app.logger.warning(
+                f"Повільний запит {request.method} {request.full_path.rstrip('?')}: {elapsed * 1000:.0f} мс, "
+                f"SQL {state['sql_count']} запитів / {state['sql_seconds'] * 1000:.0f} мс\n{statements}"
+            )
+        return response
+
+    def render(self):
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.request_seconds, self.sql_queries, self.sql_seconds,
+                           self.template_seconds, self.plot_seconds, self.slow_total):
+                lines.extend(metric.render())
+
+        for name, (help_text, collect) in sorted(self.gauges.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            for key, value in sorted(collect().items()):
+                lines.append(f'{name}{_labels(("stat",), (key,))} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def slow_log(self):
+        with self._lock:
+            return list(reversed(self.slow_requests))
+
+request_metrics = RequestMetrics()
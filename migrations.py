@@ -0,0 +1,51 @@
+from sqlalchemy import inspect
+from models import db, AggregateMarker, Booking, BookingDailyRollup, Car, CarRating, Maintenance, Review, SchemaVersion
+
+def _create_aggregate_tables():
+    for model in (CarRating, BookingDailyRollup):
+        model.__table__.create(db.engine, checkfirst=True)
+
+def _create_hot_query_indexes():
+    for model in (Booking, Review, Maintenance, Car):
+        for index in model.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+
+def _create_aggregate_markers():
+    AggregateMarker.__table__.create(db.engine, checkfirst=True)
+
+MIGRATIONS = [
+    (1, 'Таблиці агрегатів рейтингів і денного звіту бронювань', _create_aggregate_tables),
+    (2, 'Складені індекси для гарячих запитів', _create_hot_query_indexes),
+    (3, 'Позначки побудованих агрегатів', _create_aggregate_markers),
+]
+
+def get_current_version():
+    if not inspect(db.engine).has_table(SchemaVersion.__tablename__):
+        return 0
+    return db.session.query(db.func.coalesce(db.func.max(SchemaVersion.version), 0)).scalar()
+
+def upgrade():
+    SchemaVersion.__table__.create(db.engine, checkfirst=True)
+    current = get_current_version()
+
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        migrate()
+        db.session.add(SchemaVersion(version=version, description=description))
+        db.session.commit()
+        applied.append((version, description))
+    return applied
+
+def explain(query):
+    dialect = db.engine.dialect
+    compiled = query.statement.compile(dialect=dialect, compile_kwargs={'render_postcompile': True})
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect.name == 'sqlite' else 'EXPLAIN '
+
+    with db.engine.connect() as connection:
+        params = compiled.params
+        if compiled.positional:
+            params = tuple(params[name] for name in compiled.positiontup)
+        rows = connection.exec_driver_sql(prefix + str(compiled), params).fetchall()
+    return '\n'.join(str(row[-1]) for row in rows)
@@ -36,6 +36,7 @@ class Location(db.Model):
 
 class Car(db.Model):
     __tablename__ = 'cars'
+    __table_args__ = (db.Index('ix_cars_status_class_location', 'status', 'car_class', 'location_id'),)
     id = db.Column(db.Integer, primary_key=True)
     brand = db.Column(db.String(50), nullable=False)
     model = db.Column(db.String(50), nullable=False)
@@ -55,6 +56,10 @@ class Car(db.Model):
 
 class Booking(db.Model):
     __tablename__ = 'bookings'
+    __table_args__ = (
+        db.Index('ix_bookings_car_status_dates', 'car_id', 'status', 'start_date', 'end_date'),
+        db.Index('ix_bookings_user_start', 'user_id', 'start_date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True) 
     car_id = db.Column(db.Integer, db.ForeignKey('cars.id'), nullable=False)
@@ -70,6 +75,7 @@ class Booking(db.Model):
 
 class Review(db.Model):
     __tablename__ = 'reviews'
+    __table_args__ = (db.Index('ix_reviews_car_created', 'car_id', 'created_at'),)
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     car_id = db.Column(db.Integer, db.ForeignKey('cars.id'), nullable=False)
@@ -84,6 +90,7 @@ class Review(db.Model):
 
 class Maintenance(db.Model):
     __tablename__ = 'maintenance'
+    __table_args__ = (db.Index('ix_maintenance_car_date', 'car_id', 'date'),)
     id = db.Column(db.Integer, primary_key=True)
     car_id = db.Column(db.Integer, db.ForeignKey('cars.id'), nullable=False)
     date = db.Column(db.Date, nullable=False)
@@ -92,3 +99,36 @@ class Maintenance(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.now)
 
     car = db.relationship('Car', backref='maintenance_records')
+
+class CarRating(db.Model):
+    __tablename__ = 'car_ratings'
+    car_id = db.Column(db.Integer, db.ForeignKey('cars.id'), primary_key=True)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+
+    car = db.relationship('Car', backref=db.backref('rating', uselist=False, cascade='all, delete-orphan'))
+
+    @property
+    def average(self):
+        return self.rating_sum / self.review_count if self.review_count else 0
+
+class BookingDailyRollup(db.Model):
+    __tablename__ = 'booking_daily_rollup'
+    __table_args__ = (db.UniqueConstraint('date', 'location_id', 'car_class', name='uq_booking_daily_rollup'),)
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    location_id = db.Column(db.Integer, db.ForeignKey('locations.id'), nullable=True)
+    car_class = db.Column(db.String(50), nullable=True)
+    income = db.Column(db.Float, nullable=False, default=0)
+    booking_count = db.Column(db.Integer, nullable=False, default=0)
+
+class AggregateMarker(db.Model):
+    __tablename__ = 'aggregate_markers'
+    name = db.Column(db.String(50), primary_key=True)
+    built_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+class SchemaVersion(db.Model):
+    __tablename__ = 'schema_version'
+    version = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(200), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.now)
@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+import json
+import os
+
+class PlotCache:
+    def __init__(self, max_entries=64, max_bytes=32 * 1024 * 1024, disk_dir=None, max_disk_entries=512):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    def configure(self, max_entries=None, max_bytes=None, disk_dir=None, max_disk_entries=None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if max_disk_entries is not None:
+                self.max_disk_entries = max_disk_entries
+            self.disk_dir = disk_dir
+            if disk_dir:
+                os.makedirs(disk_dir, exist_ok=True)
+            self._evict()
+
+    @staticmethod
+    def make_key(kind, *data):
+        payload = json.dumps([kind, data], default=str, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf8')).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f'{key}.plot')
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            _, value = self._entries.popitem(last=False)
+            self._size -= len(value)
+
+    def _prune_disk(self):
+        files = [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir) if name.endswith('.plot')]
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _store(self, key, value):
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        self._entries[key] = value
+        self._size += len(value)
+        self._evict()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+            if self.disk_dir and os.path.exists(self._disk_path(key)):
+                with open(self._disk_path(key), 'rb') as f:
+                    value = f.read()
+                os.utime(self._disk_path(key))
+                self._store(key, value)
+                self.disk_hits += 1
+                return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._store(key, value)
+            if self.disk_dir:
+                tmp_path = self._disk_path(key) + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(value)
+                os.replace(tmp_path, self._disk_path(key))
+                self._prune_disk()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            if self.disk_dir:
+                for name in os.listdir(self.disk_dir):
+                    if name.endswith('.plot'):
+                        os.remove(os.path.join(self.disk_dir, name))
+
+    def get_or_render(self, key, render):
+        value = self.get(key)
+        if value is None:
+            value = render()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._size
+            }
+
+plot_cache = PlotCache()
@@ -1,116 +1,182 @@
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import base64
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from threading import BoundedSemaphore, Lock
+import os
+import time
+import matplotlib
+from matplotlib.figure import Figure
+from metrics import request_metrics
+from plot_cache import plot_cache
+
+CHART_FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml'
+}
+
+_render_pool = None
+_render_slots = None
+_render_timeout = 30
+_render_pool_lock = Lock()
+
+def _create_render_pool(max_workers=None, max_pending=8, timeout=30):
+    global _render_pool, _render_slots, _render_timeout
+    max_workers = max_workers or int(os.getenv('PLOT_WORKERS', 2))
+    _render_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='plot-render')
+    _render_slots = BoundedSemaphore(max_workers + max_pending)
+    _render_timeout = timeout
+
+def configure_render_pool(max_workers=None, max_pending=8, timeout=30):
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False)
+        _create_render_pool(max_workers, max_pending, timeout)
+
+def _get_render_pool():
+    with _render_pool_lock:
+        if _render_pool is None:
+            _create_render_pool()
+        return _render_pool, _render_slots
 
-def generate_income_plot(days, income, period):
+def _figure_to_bytes(fig, fmt):
+    fig.tight_layout()
+    
+    buf = BytesIO()
+    fig.savefig(buf, format=fmt, dpi=100)
+    return buf.getvalue()
+
+def _submit_render(render, data, fmt):
+    pool, slots = _get_render_pool()
+    if not slots.acquire(timeout=_render_timeout):
+        raise RuntimeError('Черга побудови графіків переповнена.')
     try:
-        fig, ax = plt.subplots(figsize=(10, 5))
-        
-        if days:
-            bars = ax.bar(days, income, color='#ff9800', edgecolor='#e68900', linewidth=1.2)
-            
-            for bar, val in zip(bars, income):
-                height = bar.get_height()
-                ax.annotate(f'{val:.0f}',
-                            xy=(bar.get_x() + bar.get_width() / 2, height),
-                            xytext=(0, 3),
-                            textcoords="offset points",
-                            ha='center', va='bottom', fontsize=9, color='#333')
-        else:
-            ax.text(0.5, 0.5, 'Немає даних за обраний період', ha='center', va='center', fontsize=14)
-            
-        ax.set_title(f'Статистика ({period})', fontsize=14, fontweight='bold')
-        ax.set_xlabel('Час', fontsize=11)
-        ax.set_ylabel('Значення', fontsize=11)
-        ax.tick_params(axis='x', rotation=45)
-        ax.grid(axis='y', alpha=0.3)
+        future = pool.submit(render, *data, fmt)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future.result(timeout=_render_timeout)
+
+def _timed_render(kind, render, data, fmt):
+    started = time.perf_counter()
+    try:
+        return _submit_render(render, data, fmt)
+    finally:
+        request_metrics.observe_plot(kind, time.perf_counter() - started)
+
+def _cached_plot(kind, render, data, fmt):
+    key = chart_etag(kind, data, fmt)
+    return plot_cache.get_or_render(key, lambda: _timed_render(kind, render, data, fmt))
+
+def _render_income_plot(days, income, period, fmt='png'):
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    
+    if days:
+        bars = ax.bar(days, income, color='#ff9800', edgecolor='#e68900', linewidth=1.2)
         
-        plt.tight_layout()
+        for bar, val in zip(bars, income):
+            height = bar.get_height()
+            ax.annotate(f'{val:.0f}',
+                        xy=(bar.get_x() + bar.get_width() / 2, height),
+                        xytext=(0, 3),
+                        textcoords="offset points",
+                        ha='center', va='bottom', fontsize=9, color='#333')
+    else:
+        ax.text(0.5, 0.5, 'Немає даних за обраний період', ha='center', va='center', fontsize=14)
         
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=100)
-        buf.seek(0)
-        plot_url = base64.b64encode(buf.getvalue()).decode('utf8')
-        plt.close(fig)
-        return plot_url
+    ax.set_title(f'Статистика ({period})', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Час', fontsize=11)
+    ax.set_ylabel('Значення', fontsize=11)
+    ax.tick_params(axis='x', rotation=45)
+    ax.grid(axis='y', alpha=0.3)
+    
+    return _figure_to_bytes(fig, fmt)
+
+def generate_income_plot(days, income, period, fmt='png'):
+    try:
+        return _cached_plot('income', _render_income_plot, (days, income, period), fmt)
     except Exception as e:
         print(f"Помилка побудови графіка: {e}")
         return None
 
-def generate_maintenance_plot(dates, costs, car_name):
-    try:
-        fig, ax = plt.subplots(figsize=(10, 5))
+def _render_maintenance_plot(dates, costs, car_name, fmt='png'):
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    
+    if dates and costs:
+        ax.plot(dates, costs, marker='o', linestyle='-', color='#2196F3', 
+                linewidth=2, markersize=8, markerfacecolor='#1976D2', markeredgecolor='white')
+        
+        ax.fill_between(dates, costs, alpha=0.2, color='#2196F3')
         
-        if dates and costs:
-            ax.plot(dates, costs, marker='o', linestyle='-', color='#2196F3', 
-                    linewidth=2, markersize=8, markerfacecolor='#1976D2', markeredgecolor='white')
-            
-            ax.fill_between(dates, costs, alpha=0.2, color='#2196F3')
-            
-            for i, (x, y) in enumerate(zip(dates, costs)):
-                ax.annotate(f'{y:.0f} грн',
-                            xy=(x, y),
-                            xytext=(0, 10),
-                            textcoords="offset points",
-                            ha='center', va='bottom', fontsize=9, 
-                            bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='#2196F3', alpha=0.8))
-            
-            total = sum(costs)
-            ax.axhline(y=sum(costs)/len(costs), color='#f44336', linestyle='--', 
-                       alpha=0.7, label=f'Середнє: {total/len(costs):.0f} грн')
-            ax.legend(loc='upper right')
-        else:
-            ax.text(0.5, 0.5, 'Немає записів про обслуговування', ha='center', va='center', fontsize=14)
-            
-        ax.set_title(f'Витрати на обслуговування: {car_name}', fontsize=14, fontweight='bold')
-        ax.set_xlabel('Дата', fontsize=11)
-        ax.set_ylabel('Вартість (грн)', fontsize=11)
-        ax.tick_params(axis='x', rotation=45)
-        ax.grid(True, alpha=0.3)
+        for i, (x, y) in enumerate(zip(dates, costs)):
+            ax.annotate(f'{y:.0f} грн',
+                        xy=(x, y),
+                        xytext=(0, 10),
+                        textcoords="offset points",
+                        ha='center', va='bottom', fontsize=9, 
+                        bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='#2196F3', alpha=0.8))
         
-        plt.tight_layout()
+        total = sum(costs)
+        ax.axhline(y=sum(costs)/len(costs), color='#f44336', linestyle='--', 
+                   alpha=0.7, label=f'Середнє: {total/len(costs):.0f} грн')
+        ax.legend(loc='upper right')
+    else:
+        ax.text(0.5, 0.5, 'Немає записів про обслуговування', ha='center', va='center', fontsize=14)
         
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=100)
-        buf.seek(0)
-        plot_url = base64.b64encode(buf.getvalue()).decode('utf8')
-        plt.close(fig)
-        return plot_url
+    ax.set_title(f'Витрати на обслуговування: {car_name}', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Дата', fontsize=11)
+    ax.set_ylabel('Вартість (грн)', fontsize=11)
+    ax.tick_params(axis='x', rotation=45)
+    ax.grid(True, alpha=0.3)
+    
+    return _figure_to_bytes(fig, fmt)
+
+def generate_maintenance_plot(dates, costs, car_name, fmt='png'):
+    try:
+        return _cached_plot('maintenance', _render_maintenance_plot, (dates, costs, car_name), fmt)
     except Exception as e:
         print(f"Помилка побудови графіка обслуговування: {e}")
         return None
 
-def generate_maintenance_summary_plot(car_names, total_costs):
-    try:
-        fig, ax = plt.subplots(figsize=(10, max(5, len(car_names) * 0.5)))
+def _render_maintenance_summary_plot(car_names, total_costs, fmt='png'):
+    fig = Figure(figsize=(10, max(5, len(car_names) * 0.5)))
+    ax = fig.subplots()
+    
+    if car_names and total_costs:
+        colors = matplotlib.colormaps['Blues']([0.4 + 0.4 * i / len(car_names) for i in range(len(car_names))])
+        bars = ax.barh(car_names, total_costs, color=colors, edgecolor='#1565C0')
         
-        if car_names and total_costs:
-            colors = plt.cm.Blues([0.4 + 0.4 * i / len(car_names) for i in range(len(car_names))])
-            bars = ax.barh(car_names, total_costs, color=colors, edgecolor='#1565C0')
-            
-            for bar, val in zip(bars, total_costs):
-                ax.annotate(f'{val:.0f} грн',
-                            xy=(val, bar.get_y() + bar.get_height() / 2),
-                            xytext=(5, 0),
-                            textcoords="offset points",
-                            ha='left', va='center', fontsize=10, fontweight='bold')
-        else:
-            ax.text(0.5, 0.5, 'Немає даних про обслуговування', ha='center', va='center', fontsize=14)
-            
-        ax.set_title('Загальні витрати на обслуговування по авто', fontsize=14, fontweight='bold')
-        ax.set_xlabel('Загальна вартість (грн)', fontsize=11)
-        ax.grid(axis='x', alpha=0.3)
+        for bar, val in zip(bars, total_costs):
+            ax.annotate(f'{val:.0f} грн',
+                        xy=(val, bar.get_y() + bar.get_height() / 2),
+                        xytext=(5, 0),
+                        textcoords="offset points",
+                        ha='left', va='center', fontsize=10, fontweight='bold')
+    else:
+        ax.text(0.5, 0.5, 'Немає даних про обслуговування', ha='center', va='center', fontsize=14)
         
-        plt.tight_layout()
-        
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=100)
-        buf.seek(0)
-        plot_url = base64.b64encode(buf.getvalue()).decode('utf8')
-        plt.close(fig)
-        return plot_url
+    ax.set_title('Загальні витрати на обслуговування по авто', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Загальна вартість (грн)', fontsize=11)
+    ax.grid(axis='x', alpha=0.3)
+    
+    return _figure_to_bytes(fig, fmt)
+
+def generate_maintenance_summary_plot(car_names, total_costs, fmt='png'):
+    try:
+        return _cached_plot('maintenance_summary', _render_maintenance_summary_plot, (car_names, total_costs), fmt)
     except Exception as e:
         print(f"Помилка побудови зведеного графіка: {e}")
         return None
+
+CHART_GENERATORS = {
+    'income': generate_income_plot,
+    'maintenance': generate_maintenance_plot,
+    'maintenance_summary': generate_maintenance_summary_plot
+}
+
+def chart_etag(kind, data, fmt):
+    return plot_cache.make_key(kind, fmt, *data)
+
+def render_chart(kind, data, fmt='png'):
+    return CHART_GENERATORS[kind](*data, fmt=fmt)
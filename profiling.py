@@ -0,0 +1,181 @@
+from collections import Counter
+from datetime import datetime
+from threading import Event, Lock, Thread, get_ident
+import cProfile
+import json
+import os
+import random
+import re
+import sys
+import time
+from werkzeug.exceptions import HTTPException
+
+PROFILE_FORMATS = ('pstats', 'collapsed')
+PROFILE_NAME = re.compile(r'^[\w.-]+\.(pstats|collapsed)$')
+SETTINGS_NAME = 'settings.json'
+
+class StackSampler:
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = Event()
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}')
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common())
+
+class RequestProfiler:
+    def __init__(self):
+        self.app = None
+        self.profile_dir = None
+        self.max_profiles = 50
+        self.interval = 0.005
+        self.sample_rate = 0
+        self.endpoint = None
+        self.fmt = 'pstats'
+        self.poll_interval = 1.0
+        self._settings_mtime = None
+        self._next_poll = 0
+        self._wsgi_app = None
+        self._lock = Lock()
+
+    def init_app(self, app, profile_dir, max_profiles=50, interval=0.005):
+        self.app = app
+        self.profile_dir = profile_dir
+        self.max_profiles = max_profiles
+        self.interval = interval
+        self._wsgi_app = app.wsgi_app
+        app.wsgi_app = self
+
+    @property
+    def enabled(self):
+        return bool(self.sample_rate or self.endpoint)
+
+    @property
+    def settings_path(self):
+        return os.path.join(self.profile_dir, SETTINGS_NAME)
+
+    def _apply(self, sample_rate, endpoint, fmt):
+        if fmt not in PROFILE_FORMATS:
+            raise ValueError(f'Непідтримуваний формат профілю: {fmt}.')
+        if not 0 <= sample_rate <= 1:
+            raise ValueError('Частка запитів має бути від 0 до 1.')
+
+        with self._lock:
+            self.sample_rate = sample_rate
+            self.endpoint = endpoint or None
+            self.fmt = fmt
+
+    def configure(self, sample_rate=0, endpoint=None, fmt='pstats', persist=True):
+        self._apply(sample_rate, endpoint, fmt)
+        if not persist:
+            return
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        temporary = f'{self.settings_path}.{os.getpid()}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump({'sample_rate': self.sample_rate, 'endpoint': self.endpoint, 'fmt': self.fmt}, f)
+        os.replace(temporary, self.settings_path)
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now < self._next_poll:
+            return
+        self._next_poll = now + self.poll_interval
+
+        try:
+            mtime = os.stat(self.settings_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._settings_mtime:
+            return
+
+        try:
+            with open(self.settings_path) as f:
+                settings = json.load(f)
+            self._apply(float(settings.get('sample_rate') or 0), settings.get('endpoint'),
+                        settings.get('fmt', 'pstats'))
+        except (OSError, TypeError, ValueError, AttributeError):
+            return
+        self._settings_mtime = mtime
+
+    def _match_endpoint(self, environ):
+        try:
+            endpoint, _ = self.app.url_map.bind_to_environ(environ).match()
+            return endpoint
+        except HTTPException:
+            return None
+
+    def __call__(self, environ, start_response):
+        self.refresh()
+        if not (self.sample_rate or self.endpoint):
+            return self._wsgi_app(environ, start_response)
+
+        endpoint = self._match_endpoint(environ)
+        if self.endpoint:
+            selected = endpoint == self.endpoint
+        else:
+            selected = random.random() < self.sample_rate
+        if not selected:
+            return self._wsgi_app(environ, start_response)
+
+        fmt = self.fmt
+        started = time.perf_counter()
+        if fmt == 'pstats':
+            profiler = cProfile.Profile()
+            response = profiler.runcall(self._wsgi_app, environ, start_response)
+        else:
+            with StackSampler(get_ident(), self.interval) as sampler:
+                response = self._wsgi_app(environ, start_response)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}_{endpoint or 'unknown'}_{elapsed_ms:.0f}ms.{fmt}"
+        path = os.path.join(self.profile_dir, name)
+        if fmt == 'pstats':
+            profiler.dump_stats(path)
+        else:
+            with open(path, 'w') as f:
+                f.write(sampler.collapsed())
+        self._prune()
+        return response
+
+    def _prune(self):
+        with self._lock:
+            names = sorted(name for name in os.listdir(self.profile_dir) if PROFILE_NAME.match(name))
+            for name in names[:max(0, len(names) - self.max_profiles)]:
+                try:
+                    os.remove(os.path.join(self.profile_dir, name))
+                except OSError:
+                    pass
+
+    def list_profiles(self):
+        if not self.profile_dir or not os.path.isdir(self.profile_dir):
+            return []
+        profiles = []
+        for name in sorted(os.listdir(self.profile_dir), reverse=True):
+            if PROFILE_NAME.match(name):
+                profiles.append({'name': name, 'size': os.path.getsize(os.path.join(self.profile_dir, name))})
+        return profiles
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+@contextmanager
+def assert_max_queries(engine, limit):
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        statements = '\n\n'.join(counter.statements)
+        raise AssertionError(f'Виконано {counter.count} запитів, дозволено {limit}:\n\n{statements}')
+
+def assert_page_queries(app, engine, url, user_id, limit):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+    with app.app_context(), assert_max_queries(engine, limit) as counter:
+        response = client.get(url)
+        if response.status_code != 200:
+            raise AssertionError(f'Відповідь {response.status_code}, очікувалось 200')
+    return counter
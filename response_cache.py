@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+from threading import Lock
+import hashlib
+import time
+from flask import Response, make_response, request
+from flask_login import current_user
+
+class ResponseCache:
+    def __init__(self, max_entries=256, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+            self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+            self._entries.clear()
+
+    def make_key(self):
+        args = sorted(request.args.items(multi=True))
+        return (self.version, request.path, tuple(args), datetime.now().date())
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry['stored_at'] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, response):
+        body = response.get_data()
+        entry = {
+            'body': body,
+            'mimetype': response.mimetype,
+            'etag': hashlib.sha256(body).hexdigest()[:32],
+            'last_modified': self.last_modified,
+            'stored_at': time.monotonic()
+        }
+        with self._lock:
+            if key[0] == self.version:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return {
+                'version': self.version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries)
+            }
+
+response_cache = ResponseCache()
+
+def _cached_response(entry):
+    response = Response(entry['body'], mimetype=entry['mimetype'])
+    response.set_etag(entry['etag'])
+    response.last_modified = entry['last_modified']
+    response.cache_control.public = True
+    response.cache_control.max_age = 0
+    response.cache_control.must_revalidate = True
+    response.vary.add('Cookie')
+    return response.make_conditional(request)
+
+def cached_page(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if current_user.is_authenticated:
+            return view(*args, **kwargs)
+
+        key = response_cache.make_key()
+        entry = response_cache.get(key)
+        if entry is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.direct_passthrough:
+                return response
+            entry = response_cache.put(key, response)
+        return _cached_response(entry)
+    return wrapper
@@ -0,0 +1,28 @@
+from threading import Event
+import time
+
+class PeriodicJob:
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.last_run = None
+        self.last_result = None
+        self._stop = Event()
+
+    def run(self, app, on_result=None):
+        self._stop.clear()
+        while True:
+            with app.app_context():
+                try:
+                    self.last_result = self.func()
+                    if on_result:
+                        on_result(self.last_result)
+                except Exception as e:
+                    app.logger.error(f'Помилка фонового завдання {self.name}: {e}')
+            self.last_run = time.time()
+            if not self.interval or self._stop.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop.set()
@@ -1,5 +1,8 @@
 import re
 from models import db, User
+from services.password_hasher import HashingBusyError, password_hasher
+
+BUSY_MESSAGE = 'Сервер перевантажено. Будь ласка, спробуйте ще раз за хвилину.'
 
 def register_user(form_data):
     username = form_data['username']
@@ -12,15 +15,30 @@ def register_user(form_data):
     if User.query.filter_by(email=email).first():
         return False, 'Електронна пошта вже зареєстрована.', None
 
-    new_user = User(username=username, email=email)
-    new_user.set_password(password)
+    try:
+        password_hash = password_hasher.hash(password)
+    except HashingBusyError:
+        return False, BUSY_MESSAGE, None
+
+    new_user = User(username=username, email=email, password_hash=password_hash)
     db.session.add(new_user)
     db.session.commit()
     return True, 'Реєстрація успішна! Ласкаво просимо.', new_user
 
 def authenticate_user(email, password):
     user = User.query.filter_by(email=email).first()
-    if user and user.check_password(password):
+    if not user:
+        return False, 'Невірна адреса електронної пошти або пароль.', None
+
+    try:
+        password_ok = password_hasher.verify(user.password_hash, password)
+        if password_ok and password_hasher.needs_rehash(user.password_hash):
+            user.password_hash = password_hasher.hash(password)
+            db.session.commit()
+    except HashingBusyError:
+        return False, BUSY_MESSAGE, None
+
+    if password_ok:
         if user.is_blocked:
              return False, 'Ваш акаунт було заблоковано. Будь ласка, зверніться до служби підтримки.', None
         return True, 'Вхід успішний!', user
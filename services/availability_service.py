@@ -0,0 +1,57 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import case
+from models import db, Car, Booking
+from enums import BookingStatus, CarStatus
+
+FLEET_STATUSES = [status.value for status in CarStatus if status != CarStatus.MAINTENANCE]
+
+def get_fleet_query(class_filter=None):
+    query = Car.query.filter(Car.status.in_(FLEET_STATUSES))
+
+    if class_filter and class_filter != 'Всі':
+        query = query.filter_by(car_class=class_filter)
+
+    return query
+
+def booked_car_ids_query(car_query=None, on_date=None):
+    on_date = on_date or datetime.now().date()
+
+    query = db.session.query(Booking.car_id).filter(
+        Booking.status == BookingStatus.CONFIRMED.value,
+        Booking.start_date <= on_date,
+        Booking.end_date >= on_date
+    )
+
+    if car_query is not None:
+        query = query.filter(Booking.car_id.in_(car_query.with_entities(Car.id)))
+
+    return query.group_by(Booking.car_id)
+
+def expected_car_status(on_date=None):
+    booked = booked_car_ids_query(on_date=on_date).subquery()
+    return case((Car.id.in_(db.session.query(booked.c.car_id)), CarStatus.BOOKED.value),
+                else_=CarStatus.AVAILABLE.value)
+
+def refresh_car_status(car, on_date=None):
+    if car.status == CarStatus.MAINTENANCE.value:
+        return
+    car.status = db.session.query(expected_car_status(on_date)).filter(Car.id == car.id).scalar()
+
+def get_booked_car_ids(car_query=None, on_date=None):
+    return {row.car_id for row in booked_car_ids_query(car_query, on_date)}
+
+def get_fleet_with_availability(class_filter=None, on_date=None):
+    query = get_fleet_query(class_filter)
+    all_cars = query.all()
+    if current_app.config.get('CAR_AVAILABILITY_SOURCE') == 'status' and on_date is None:
+        for car in all_cars:
+            car.is_booked_now = car.status == CarStatus.BOOKED.value
+        return all_cars
+
+    booked_ids = get_booked_car_ids(query, on_date)
+
+    for car in all_cars:
+        car.is_booked_now = car.id in booked_ids
+
+    return all_cars
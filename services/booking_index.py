@@ -0,0 +1,89 @@
+from bisect import bisect_left, insort
+from threading import Lock
+import time
+from models import Booking
+from enums import BookingStatus
+
+ACTIVE_EXCLUDED_STATUSES = [BookingStatus.CANCELED.value, BookingStatus.COMPLETED.value]
+
+class CarIntervalIndex:
+    def __init__(self, intervals=()):
+        self.loaded_at = time.monotonic()
+        self.intervals = sorted(intervals)
+        self._rebuild_prefix()
+
+    def _rebuild_prefix(self):
+        self.starts = [start for start, end, booking_id in self.intervals]
+        self.max_ends = []
+        current = None
+        for start, end, booking_id in self.intervals:
+            current = end if current is None or end > current else current
+            self.max_ends.append(current)
+
+    def overlaps(self, start_date, end_date):
+        position = bisect_left(self.starts, end_date)
+        if position == 0:
+            return False
+        return self.max_ends[position - 1] > start_date
+
+    def add(self, booking_id, start_date, end_date):
+        self.remove(booking_id)
+        insort(self.intervals, (start_date, end_date, booking_id))
+        self._rebuild_prefix()
+
+    def remove(self, booking_id):
+        intervals = [item for item in self.intervals if item[2] != booking_id]
+        if len(intervals) != len(self.intervals):
+            self.intervals = intervals
+            self._rebuild_prefix()
+
+class BookingIntervalIndex:
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._cars = {}
+        self._lock = Lock()
+
+    def _active(self, car_id):
+        return Booking.query.filter(
+            Booking.car_id == car_id,
+            Booking.status.notin_(ACTIVE_EXCLUDED_STATUSES)
+        )
+
+    def _load(self, car_id):
+        rows = self._active(car_id).with_entities(Booking.id, Booking.start_date, Booking.end_date).all()
+        return CarIntervalIndex([(row.start_date, row.end_date, row.id) for row in rows])
+
+    def _is_fresh(self, entry):
+        if entry is None:
+            return False
+        return self.ttl is None or time.monotonic() - entry.loaded_at <= self.ttl
+
+    def has_overlap(self, car_id, start_date, end_date):
+        with self._lock:
+            entry = self._cars.get(car_id)
+            if self._is_fresh(entry):
+                return entry.overlaps(start_date, end_date)
+
+        entry = self._load(car_id)
+        with self._lock:
+            self._cars[car_id] = entry
+        return entry.overlaps(start_date, end_date)
+
+    def record_booking(self, booking):
+        with self._lock:
+            entry = self._cars.get(booking.car_id)
+            if entry is None:
+                return
+            if booking.status in ACTIVE_EXCLUDED_STATUSES:
+                entry.remove(booking.id)
+            else:
+                entry.add(booking.id, booking.start_date, booking.end_date)
+
+    def invalidate(self, car_id=None):
+        with self._lock:
+            if car_id is None:
+                self._cars.clear()
+            else:
+                self._cars.pop(car_id, None)
+
+booking_index = BookingIntervalIndex()
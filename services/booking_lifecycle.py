@@ -0,0 +1,68 @@
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from models import db, Booking, Car
+from enums import BookingStatus, CarStatus
+from response_cache import response_cache
+from services.availability_service import expected_car_status
+from services.booking_index import booking_index
+from services.occupancy_service import occupancy_snapshot
+from services.rollup_service import record_status_change
+
+def finalize_expired_bookings(today=None, batch_size=500):
+    today = today or datetime.now().date()
+    finalized = 0
+
+    while True:
+        bookings = Booking.query.options(joinedload(Booking.car)).filter(
+            Booking.status == BookingStatus.CONFIRMED.value,
+            Booking.end_date < today
+        ).order_by(Booking.id).limit(batch_size).all()
+        if not bookings:
+            return finalized
+
+        updated_ids = set(db.session.execute(
+            update(Booking).where(
+                Booking.id.in_([booking.id for booking in bookings]),
+                Booking.status == BookingStatus.CONFIRMED.value
+            ).values(status=BookingStatus.COMPLETED.value).returning(Booking.id),
+            execution_options={'synchronize_session': False}
+        ).scalars())
+
+        completed = [booking for booking in bookings if booking.id in updated_ids]
+        for booking in completed:
+            set_committed_value(booking, 'status', BookingStatus.COMPLETED.value)
+            record_status_change(booking, BookingStatus.CONFIRMED.value)
+        car_ids = {booking.car_id for booking in completed}
+        db.session.commit()
+
+        for car_id in car_ids:
+            booking_index.invalidate(car_id)
+        finalized += len(completed)
+
+def sync_car_statuses(today=None, batch_size=500):
+    today = today or datetime.now().date()
+    expected = expected_car_status(today)
+
+    stale = db.session.query(Car.id, expected.label('expected')).filter(
+        Car.status != CarStatus.MAINTENANCE.value,
+        Car.status.is_distinct_from(expected)
+    ).order_by(Car.id).all()
+
+    for start in range(0, len(stale), batch_size):
+        batch = stale[start:start + batch_size]
+        for status in (CarStatus.BOOKED.value, CarStatus.AVAILABLE.value):
+            ids = [row.id for row in batch if row.expected == status]
+            if ids:
+                Car.query.filter(Car.id.in_(ids)).update({Car.status: status}, synchronize_session=False)
+        db.session.commit()
+    return len(stale)
+
+def run_booking_lifecycle(today=None, batch_size=500):
+    finalized = finalize_expired_bookings(today, batch_size)
+    synced = sync_car_statuses(today, batch_size)
+    if finalized or synced:
+        occupancy_snapshot.invalidate()
+        response_cache.bump()
+    return finalized, synced
@@ -1,11 +1,65 @@
+from contextlib import contextmanager
 from datetime import datetime
 import re
-from models import db, Booking
-from enums import BookingStatus, CarStatus
+from flask import current_app
+from sqlalchemy.exc import OperationalError
+from models import db, Booking, Car
+from enums import BookingStatus
+from services.availability_service import refresh_car_status
+from services.booking_index import booking_index
+from services.occupancy_service import occupancy_snapshot
+from services.rollup_service import record_status_change
+from response_cache import response_cache
 
 def validate_phone(phone):
     return bool(re.match(r'^\+?[\d\s-]{10,15}$', phone))
 
+@contextmanager
+def car_reservation_lock(car_id):
+    if current_app.config.get('BOOKING_RESERVATION_MODE') != 'locked':
+        yield True
+        return
+
+    if db.engine.dialect.name == 'sqlite':
+        dbapi_connection = db.session.connection().connection.dbapi_connection
+        busy_timeout = dbapi_connection.execute('PRAGMA busy_timeout').fetchone()[0]
+        dbapi_connection.execute(f"PRAGMA busy_timeout = {current_app.config.get('BOOKING_LOCK_TIMEOUT_MS', 50)}")
+        try:
+            if dbapi_connection.in_transaction:
+                dbapi_connection.execute('UPDATE cars SET id = id WHERE id = ?', (car_id,))
+            else:
+                dbapi_connection.execute('BEGIN IMMEDIATE')
+            acquired = True
+        except dbapi_connection.OperationalError:
+            db.session.rollback()
+            acquired = False
+        finally:
+            dbapi_connection.execute(f'PRAGMA busy_timeout = {busy_timeout}')
+        yield acquired
+        return
+
+    try:
+        db.session.query(Car.id).filter(Car.id == car_id).with_for_update(nowait=True).first()
+        acquired = True
+    except OperationalError:
+        db.session.rollback()
+        acquired = False
+    yield acquired
+
+def overlapping_bookings_query(car_id, start_date, end_date):
+    return Booking.query.filter(
+        Booking.car_id == car_id,
+        Booking.status.notin_([BookingStatus.CANCELED.value, BookingStatus.COMPLETED.value]),
+        Booking.end_date > start_date,
+        Booking.start_date < end_date
+    )
+
+def has_overlapping_booking(car_id, start_date, end_date):
+    if current_app.config.get('BOOKING_OVERLAP_BACKEND') == 'index':
+        return booking_index.has_overlap(car_id, start_date, end_date)
+
+    return overlapping_bookings_query(car_id, start_date, end_date).first() is not None
+
 def process_booking(user_id, car, form_data):
     start_date_str = form_data['start_date']
     end_date_str = form_data['end_date']
@@ -25,31 +79,30 @@ def process_booking(user_id, car, form_data):
         if end_date <= start_date:
             return False, 'Дата закінчення повинна бути після дати початку.'
 
-        overlapping_bookings = Booking.query.filter(
-            Booking.car_id == car.id,
-            Booking.status.notin_([BookingStatus.CANCELED.value, BookingStatus.COMPLETED.value]),
-            Booking.end_date > start_date,
-            Booking.start_date < end_date
-        ).first()
-        
-        if overlapping_bookings:
-            return False, 'Автомобіль уже заброньовано на ці дати.'
-
+        car_id = car.id
         days = (end_date - start_date).days
         total_price = days * car.price_per_day
 
-        new_booking = Booking(
-            car_id=car.id,
-            user_id=user_id,
-            start_date=start_date,
-            end_date=end_date,
-            total_price=total_price,
-            customer_name=name,
-            customer_phone=phone
-        )
+        with car_reservation_lock(car_id) as acquired:
+            if not acquired or has_overlapping_booking(car_id, start_date, end_date):
+                db.session.rollback()
+                return False, 'Автомобіль уже заброньовано на ці дати.'
+
+            new_booking = Booking(
+                car_id=car_id,
+                user_id=user_id,
+                start_date=start_date,
+                end_date=end_date,
+                total_price=total_price,
+                customer_name=name,
+                customer_phone=phone
+            )
 
-        db.session.add(new_booking)
-        db.session.commit()
+            db.session.add(new_booking)
+            db.session.commit()
+        booking_index.record_booking(new_booking)
+        occupancy_snapshot.invalidate()
+        response_cache.bump()
         return True, new_booking
     except ValueError:
             return False, 'Невірний формат дати.'
@@ -59,22 +112,25 @@ def process_booking(user_id, car, form_data):
 def update_booking_status(booking, action):
     message = ''
     category = 'success'
+    old_status = booking.status
     
     if action == 'confirm':
         booking.status = BookingStatus.CONFIRMED.value
-        booking.car.status = CarStatus.BOOKED.value
         message = f'Бронювання #{booking.id} підтверджено.'
     elif action == 'cancel':
         booking.status = BookingStatus.CANCELED.value
-        booking.car.status = CarStatus.AVAILABLE.value
         message = f'Бронювання #{booking.id} скасовано.'
         category = 'warning'
     elif action == 'complete':
         booking.status = BookingStatus.COMPLETED.value
-        booking.car.status = CarStatus.AVAILABLE.value
         message = f'Бронювання #{booking.id} позначено як завершене.'
     else:
         return False, 'Недійсна дія', 'danger'
     
+    refresh_car_status(booking.car)
+    record_status_change(booking, old_status)
     db.session.commit()
+    booking_index.record_booking(booking)
+    occupancy_snapshot.invalidate()
+    response_cache.bump()
     return True, message, category
@@ -1,8 +1,8 @@
-import os
-from werkzeug.utils import secure_filename
-from datetime import datetime
 from flask import url_for
 from models import db, Car
+from services.image_service import UPLOAD_PREFIX, store_image
+from services.occupancy_service import occupancy_snapshot
+from response_cache import response_cache
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 
@@ -12,11 +12,9 @@ def allowed_file(filename):
 
 def handle_image_upload(file, upload_folder):
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"{timestamp}_{filename}"
-        file.save(os.path.join(upload_folder, filename))
-        return url_for('static', filename=f'uploads/cars/{filename}')
+        ext = file.filename.rsplit('.', 1)[1].lower()
+        filename = store_image(file.read(), ext, upload_folder)
+        return url_for('static', filename=f'{UPLOAD_PREFIX}{filename}')
     return None
 
 def create_car(form_data, files, upload_folder):
@@ -47,6 +45,8 @@ def create_car(form_data, files, upload_folder):
         )
         db.session.add(new_car)
         db.session.commit()
+        occupancy_snapshot.invalidate()
+        response_cache.bump()
         return True, new_car
     except Exception as e:
         return False, str(e)
@@ -73,6 +73,8 @@ def update_car(car, form_data, files, upload_folder):
                 car.image_url = form_data['image_url']
         
         db.session.commit()
+        occupancy_snapshot.invalidate()
+        response_cache.bump()
         return True, car
     except Exception as e:
         return False, str(e)
@@ -81,6 +83,8 @@ def delete_car(car):
     try:
         db.session.delete(car)
         db.session.commit()
+        occupancy_snapshot.invalidate()
+        response_cache.bump()
         return True, None
     except Exception as e:
         return False, str(e)
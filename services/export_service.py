@@ -0,0 +1,148 @@
+from datetime import date
+import csv
+import io
+import json
+from models import db, Booking, Car, Maintenance
+from services.statistics_service import get_bucketed_series, resolve_period
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream'
+}
+
+BOOKING_COLUMNS = [
+    ('id', 'int'), ('car_id', 'int'), ('user_id', 'int'), ('location_id', 'int'), ('car_class', 'str'),
+    ('start_date', 'date'), ('end_date', 'date'), ('total_price', 'float'), ('status', 'str'),
+    ('customer_name', 'str'), ('customer_phone', 'str')
+]
+MAINTENANCE_COLUMNS = [
+    ('id', 'int'), ('car_id', 'int'), ('location_id', 'int'), ('car_class', 'str'),
+    ('date', 'date'), ('description', 'str'), ('cost', 'float')
+]
+STATISTICS_COLUMNS = [('bucket', 'str'), ('income', 'float'), ('booking_count', 'int')]
+
+EXPORT_FILTER_KEYS = ('period', 'location_id', 'car_class')
+
+def _apply_filters(query, request_args, date_column):
+    start_date, end_date, _ = resolve_period(request_args.get('period', 'month'))
+    query = query.filter(date_column >= start_date, date_column <= end_date)
+
+    location_id = request_args.get('location_id')
+    if location_id and location_id != 'all':
+        query = query.filter(Car.location_id == int(location_id))
+
+    car_class = request_args.get('car_class')
+    if car_class and car_class != 'all':
+        query = query.filter(Car.car_class == car_class)
+    return query
+
+def _stream_query(query, batch_size):
+    result = db.session.execute(query.statement.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+def _booking_partitions(request_args, batch_size):
+    query = db.session.query(
+        Booking.id, Booking.car_id, Booking.user_id, Car.location_id, Car.car_class,
+        Booking.start_date, Booking.end_date, Booking.total_price, Booking.status,
+        Booking.customer_name, Booking.customer_phone
+    ).join(Car, Booking.car_id == Car.id)
+    query = _apply_filters(query, request_args, Booking.start_date).order_by(Booking.id)
+    return _stream_query(query, batch_size)
+
+def _maintenance_partitions(request_args, batch_size):
+    query = db.session.query(
+        Maintenance.id, Maintenance.car_id, Car.location_id, Car.car_class,
+        Maintenance.date, Maintenance.description, Maintenance.cost
+    ).join(Car, Maintenance.car_id == Car.id)
+    query = _apply_filters(query, request_args, Maintenance.date).order_by(Maintenance.id)
+    return _stream_query(query, batch_size)
+
+def _statistics_partitions(request_args, batch_size):
+    start_date, end_date, aggregation_type = resolve_period(request_args.get('period', 'month'))
+    return [get_bucketed_series(aggregation_type, start_date, end_date,
+                                location_id=request_args.get('location_id'),
+                                car_class=request_args.get('car_class'))]
+
+EXPORTS = {
+    'bookings': (BOOKING_COLUMNS, _booking_partitions),
+    'maintenance': (MAINTENANCE_COLUMNS, _maintenance_partitions),
+    'statistics': (STATISTICS_COLUMNS, _statistics_partitions)
+}
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+def _iter_csv(columns, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf8')
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode('utf8')
+
+def _iter_jsonl(columns, partitions):
+    names = [name for name, _ in columns]
+    for rows in partitions:
+        yield ''.join(
+            json.dumps(dict(zip(names, map(_plain, row))), ensure_ascii=False) + '\n' for row in rows
+        ).encode('utf8')
+
+class _ChunkSink(io.RawIOBase):
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def _iter_batches(pa, schema, writer, sink, partitions):
+    for rows in partitions:
+        if rows:
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+def _iter_arrow(columns, partitions, fmt):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {'int': pa.int64(), 'float': pa.float64(), 'str': pa.string(), 'date': pa.date32()}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema) if fmt == 'parquet' else pa.ipc.new_stream(sink, schema)
+    return _iter_batches(pa, schema, writer, sink, partitions)
+
+def stream_export(dataset, fmt, request_args, batch_size=1000):
+    if dataset not in EXPORTS:
+        raise ValueError(f'Невідомий набір даних: {dataset}.')
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Непідтримуваний формат: {fmt}.')
+
+    columns, build_partitions = EXPORTS[dataset]
+    partitions = build_partitions(request_args, batch_size)
+    if fmt == 'csv':
+        return _iter_csv(columns, partitions)
+    if fmt == 'jsonl':
+        return _iter_jsonl(columns, partitions)
+    return _iter_arrow(columns, partitions, fmt)
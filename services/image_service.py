@@ -0,0 +1,126 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+import re
+from flask import current_app, url_for
+
+VARIANTS = (('thumb', 320), ('card', 640), ('full', 1600))
+WEBP_QUALITY = 80
+FALLBACK_QUALITY = 85
+UPLOAD_PREFIX = 'uploads/cars/'
+HASHED_NAME = re.compile(r'^([0-9a-f]{32})\.(png|jpg|jpeg|gif)$')
+VARIANT_NAME = re.compile(r'^[0-9a-f]{32}_(thumb|card|full)\.(webp|png|jpg)$')
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='car-images')
+_widths = {}
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()[:32]
+
+def fallback_format(ext):
+    return 'png' if ext in ('png', 'gif') else 'jpg'
+
+def variant_name(digest, variant, fmt):
+    return f'{digest}_{variant}.{fmt}'
+
+def widths_name(digest):
+    return f'{digest}_widths.json'
+
+def variant_widths(upload_folder, digest):
+    if digest in _widths:
+        return _widths[digest]
+    try:
+        with open(os.path.join(upload_folder, widths_name(digest))) as f:
+            widths = json.load(f)
+    except (OSError, ValueError):
+        return None
+    _widths[digest] = widths
+    return widths
+
+def _write_atomic(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _save_image(image, path, fmt):
+    tmp_path = path + '.tmp'
+    if fmt == 'webp':
+        image.save(tmp_path, 'WEBP', quality=WEBP_QUALITY, method=4)
+    elif fmt == 'png':
+        image.save(tmp_path, 'PNG', optimize=True)
+    else:
+        image.save(tmp_path, 'JPEG', quality=FALLBACK_QUALITY, optimize=True, progressive=True)
+    os.replace(tmp_path, path)
+
+def generate_variants(upload_folder, filename):
+    from PIL import Image, ImageOps
+
+    digest, ext = HASHED_NAME.match(filename).groups()
+    if variant_widths(upload_folder, digest) is not None:
+        return
+    fallback = fallback_format(ext)
+
+    with Image.open(os.path.join(upload_folder, filename)) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert('RGBA' if fallback == 'png' else 'RGB')
+
+    widths = {}
+    for variant, width in VARIANTS:
+        resized = image.copy()
+        resized.thumbnail((width, width * 4))
+        _save_image(resized, os.path.join(upload_folder, variant_name(digest, variant, 'webp')), 'webp')
+        _save_image(resized, os.path.join(upload_folder, variant_name(digest, variant, fallback)), fallback)
+        widths[variant] = resized.width
+    _write_atomic(os.path.join(upload_folder, widths_name(digest)), json.dumps(widths).encode('utf8'))
+    _widths[digest] = widths
+
+def _generate_in_background(upload_folder, filename):
+    try:
+        generate_variants(upload_folder, filename)
+    except Exception as e:
+        print(f'Не вдалося створити варіанти зображення {filename}: {e}')
+
+def store_image(data, ext, upload_folder, background=True):
+    ext = 'jpg' if ext == 'jpeg' else ext
+    filename = f'{content_digest(data)}.{ext}'
+    path = os.path.join(upload_folder, filename)
+    if not os.path.exists(path):
+        _write_atomic(path, data)
+
+    if background:
+        _executor.submit(_generate_in_background, upload_folder, filename)
+    else:
+        generate_variants(upload_folder, filename)
+    return filename
+
+def car_image_sources(image_url):
+    prefix = url_for('static', filename=UPLOAD_PREFIX)
+    if not image_url or not image_url.startswith(prefix):
+        return None
+    match = HASHED_NAME.match(image_url[len(prefix):])
+    if not match:
+        return None
+
+    digest, ext = match.groups()
+    widths = variant_widths(current_app.config['UPLOAD_FOLDER'], digest)
+    if widths is None:
+        return None
+
+    distinct = {}
+    for variant, _ in VARIANTS:
+        if variant in widths:
+            distinct.setdefault(widths[variant], variant)
+
+    def srcset(fmt):
+        return ', '.join(
+            f"{url_for('static', filename=UPLOAD_PREFIX + variant_name(digest, variant, fmt))} {width}w"
+            for width, variant in distinct.items()
+        )
+
+    return {
+        'webp': srcset('webp'),
+        'fallback': srcset(fallback_format(ext)),
+        'src': url_for('static', filename=UPLOAD_PREFIX + variant_name(digest, 'card', fallback_format(ext)))
+    }
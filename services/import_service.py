@@ -0,0 +1,258 @@
+from collections import defaultdict
+from datetime import datetime
+import csv
+import io
+import json
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from models import db, Booking, Car, Location, Maintenance, User
+from enums import BookingStatus, CarStatus
+from response_cache import response_cache
+from services.booking_index import ACTIVE_EXCLUDED_STATUSES, booking_index
+from services.booking_service import validate_phone
+from services.occupancy_service import occupancy_snapshot
+from services.rollup_service import record_imported_bookings
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+def _required(row, field):
+    value = row.get(field)
+    if value is None or str(value).strip() == '':
+        raise ValueError(f"Поле '{field}' обов'язкове.")
+    return str(value).strip()
+
+def _optional(row, field):
+    value = row.get(field)
+    if value is None or str(value).strip() == '':
+        return None
+    return str(value).strip()
+
+def _int(row, field, required=True):
+    value = _required(row, field) if required else _optional(row, field)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Поле '{field}' має бути цілим числом.")
+
+def _float(row, field):
+    try:
+        return float(_required(row, field))
+    except ValueError:
+        raise ValueError(f"Поле '{field}' має бути числом.")
+
+def _date(row, field):
+    try:
+        return datetime.strptime(_required(row, field), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"Поле '{field}' має бути датою у форматі РРРР-ММ-ДД.")
+
+def _choice(row, field, enum, default):
+    value = _optional(row, field) or default.value
+    if value not in [item.value for item in enum]:
+        raise ValueError(f"Недійсне значення поля '{field}': {value}.")
+    return value
+
+def _location_row(row, refs):
+    return {
+        'city': _required(row, 'city'),
+        'address': _required(row, 'address'),
+        'phone_number': _required(row, 'phone_number'),
+        'max_capacity': _int(row, 'max_capacity')
+    }
+
+def _car_row(row, refs):
+    location_id = _int(row, 'location_id', required=False)
+    if location_id is not None and location_id not in refs['locations']:
+        raise ValueError(f'Локацію #{location_id} не знайдено.')
+
+    values = {
+        'brand': _required(row, 'brand'),
+        'model': _required(row, 'model'),
+        'year': _int(row, 'year'),
+        'price_per_day': _int(row, 'price_per_day'),
+        'transmission': _required(row, 'transmission'),
+        'fuel_type': _required(row, 'fuel_type'),
+        'seats': _int(row, 'seats'),
+        'description': _optional(row, 'description'),
+        'car_class': _optional(row, 'car_class') or 'Economy',
+        'status': _choice(row, 'status', CarStatus, CarStatus.AVAILABLE),
+        'location_id': location_id
+    }
+    if _optional(row, 'image_url'):
+        values['image_url'] = _optional(row, 'image_url')
+    return values
+
+def _booking_row(row, refs):
+    car_id = _int(row, 'car_id')
+    car = refs['cars'].get(car_id)
+    if car is None:
+        raise ValueError(f'Автомобіль #{car_id} не знайдено.')
+
+    user_id = _int(row, 'user_id', required=False)
+    if user_id is not None and user_id not in refs['users']:
+        raise ValueError(f'Користувача #{user_id} не знайдено.')
+
+    phone = _required(row, 'customer_phone')
+    if not validate_phone(phone):
+        raise ValueError('Невірний формат номера телефону.')
+
+    start_date = _date(row, 'start_date')
+    end_date = _date(row, 'end_date')
+    if end_date <= start_date:
+        raise ValueError('Дата закінчення повинна бути після дати початку.')
+
+    total_price = _optional(row, 'total_price')
+    values = {
+        'car_id': car_id,
+        'user_id': user_id,
+        'start_date': start_date,
+        'end_date': end_date,
+        'total_price': _float(row, 'total_price') if total_price else (end_date - start_date).days * car.price_per_day,
+        'customer_name': _required(row, 'customer_name'),
+        'customer_phone': phone,
+        'status': _choice(row, 'status', BookingStatus, BookingStatus.NEW)
+    }
+
+    if values['status'] not in ACTIVE_EXCLUDED_STATUSES:
+        reserved = refs['reserved'][car_id]
+        if any(start_date < reserved_end and reserved_start < end_date for reserved_start, reserved_end in reserved):
+            raise ValueError('Автомобіль уже заброньовано на ці дати.')
+        reserved.append((start_date, end_date))
+    return values
+
+def _maintenance_row(row, refs):
+    car_id = _int(row, 'car_id')
+    if car_id not in refs['cars']:
+        raise ValueError(f'Автомобіль #{car_id} не знайдено.')
+    return {
+        'car_id': car_id,
+        'date': _date(row, 'date'),
+        'description': _required(row, 'description'),
+        'cost': _float(row, 'cost')
+    }
+
+IMPORTERS = {
+    'locations': (Location, _location_row),
+    'cars': (Car, _car_row),
+    'bookings': (Booking, _booking_row),
+    'maintenance': (Maintenance, _maintenance_row)
+}
+
+def _collect_ids(rows, field):
+    ids = set()
+    for _, row in rows:
+        try:
+            ids.add(int(row.get(field)))
+        except (TypeError, ValueError):
+            pass
+    return ids
+
+def _load_refs(entity, rows):
+    refs = {}
+    if entity == 'cars':
+        ids = _collect_ids(rows, 'location_id')
+        refs['locations'] = {row.id for row in db.session.query(Location.id).filter(Location.id.in_(ids))}
+    if entity in ('bookings', 'maintenance'):
+        ids = _collect_ids(rows, 'car_id')
+        cars = db.session.query(Car.id, Car.price_per_day, Car.location_id, Car.car_class).filter(Car.id.in_(ids))
+        refs['cars'] = {car.id: car for car in cars}
+    if entity == 'bookings':
+        ids = _collect_ids(rows, 'user_id')
+        refs['users'] = {row.id for row in db.session.query(User.id).filter(User.id.in_(ids))}
+        reserved = db.session.query(Booking.car_id, Booking.start_date, Booking.end_date).filter(
+            Booking.car_id.in_(refs['cars']),
+            Booking.status.notin_(ACTIVE_EXCLUDED_STATUSES)
+        )
+        refs['reserved'] = defaultdict(list)
+        for booking in reserved:
+            refs['reserved'][booking.car_id].append((booking.start_date, booking.end_date))
+    return refs
+
+def _read_records(lines, fmt, position):
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            position[0] = reader.line_num
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        position[0] = line_number
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else ValueError('Рядок не є JSON-об\'єктом.')
+
+def iter_records(stream, fmt):
+    lines = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    position = [0]
+    try:
+        yield from _read_records(lines, fmt, position)
+    except (csv.Error, UnicodeDecodeError) as e:
+        yield position[0] + 1, ValueError(f'Не вдалося прочитати файл, імпорт зупинено: {e}')
+
+def _insert_chunk(entity, model, values):
+    db.session.execute(insert(model), values)
+    if entity == 'bookings':
+        record_imported_bookings(values)
+
+def _import_chunk(entity, rows, errors):
+    model, validate = IMPORTERS[entity]
+    refs = _load_refs(entity, [(line, row) for line, row in rows if isinstance(row, dict)])
+    valid = []
+    for line, row in rows:
+        if not isinstance(row, dict):
+            errors.append((line, str(row)))
+            continue
+        try:
+            valid.append((line, validate(row, refs)))
+        except ValueError as e:
+            errors.append((line, str(e)))
+
+    if not valid:
+        return 0
+    try:
+        _insert_chunk(entity, model, [values for _, values in valid])
+        db.session.commit()
+        return len(valid)
+    except SQLAlchemyError:
+        db.session.rollback()
+
+    imported = 0
+    for line, values in valid:
+        try:
+            _insert_chunk(entity, model, [values])
+            db.session.commit()
+            imported += 1
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            errors.append((line, str(getattr(e, 'orig', None) or e)))
+    return imported
+
+def import_records(entity, stream, fmt, chunk_size=500):
+    if entity not in IMPORTERS:
+        raise ValueError(f'Невідомий тип даних: {entity}.')
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f'Непідтримуваний формат: {fmt}.')
+
+    imported = 0
+    errors = []
+    chunk = []
+    for record in iter_records(stream, fmt):
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            imported += _import_chunk(entity, chunk, errors)
+            chunk = []
+    if chunk:
+        imported += _import_chunk(entity, chunk, errors)
+
+    if imported:
+        booking_index.invalidate()
+        occupancy_snapshot.invalidate()
+        response_cache.bump()
+    return {'imported': imported, 'errors': errors}
@@ -0,0 +1,72 @@
+from datetime import datetime
+from models import Booking, Car, Maintenance, User
+from enums import BookingStatus
+from services.pagination import keyset_paginate
+from services.query_options import manage_bookings_options, manage_maintenance_options
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+def list_bookings(args, per_page, with_total=False):
+    query = Booking.query.options(*manage_bookings_options())
+
+    if args.get('status'):
+        query = query.filter(Booking.status == args['status'])
+    if args.get('car_id'):
+        query = query.filter(Booking.car_id == int(args['car_id']))
+
+    date_from = _parse_date(args.get('date_from'))
+    date_to = _parse_date(args.get('date_to'))
+    if date_from:
+        query = query.filter(Booking.end_date >= date_from)
+    if date_to:
+        query = query.filter(Booking.start_date <= date_to)
+
+    return keyset_paginate(query, [(Booking.start_date, True), (Booking.id, True)],
+                           args.get('cursor'), per_page, with_total)
+
+def list_users(args, per_page, with_total=False):
+    query = User.query
+
+    if args.get('role'):
+        query = query.filter(User.role == args['role'])
+    if args.get('blocked') in ('0', '1'):
+        query = query.filter(User.is_blocked == (args['blocked'] == '1'))
+
+    return keyset_paginate(query, [(User.id, False)], args.get('cursor'), per_page, with_total)
+
+def list_cars(args, per_page, with_total=False):
+    query = Car.query
+
+    if args.get('status'):
+        query = query.filter(Car.status == args['status'])
+    if args.get('car_class'):
+        query = query.filter(Car.car_class == args['car_class'])
+    if args.get('location_id'):
+        query = query.filter(Car.location_id == int(args['location_id']))
+
+    return keyset_paginate(query, [(Car.id, False)], args.get('cursor'), per_page, with_total)
+
+def list_maintenance(args, per_page, with_total=False):
+    query = Maintenance.query.options(*manage_maintenance_options())
+
+    if args.get('car_id'):
+        query = query.filter(Maintenance.car_id == int(args['car_id']))
+
+    date_from = _parse_date(args.get('date_from'))
+    date_to = _parse_date(args.get('date_to'))
+    if date_from:
+        query = query.filter(Maintenance.date >= date_from)
+    if date_to:
+        query = query.filter(Maintenance.date <= date_to)
+
+    return keyset_paginate(query, [(Maintenance.date, True), (Maintenance.id, True)],
+                           args.get('cursor'), per_page, with_total)
+
+def list_active_trips(today=None):
+    today = today or datetime.now().date()
+    return Booking.query.options(*manage_bookings_options()).filter(
+        Booking.status == BookingStatus.CONFIRMED.value,
+        Booking.start_date <= today,
+        Booking.end_date >= today
+    ).order_by(Booking.start_date.desc(), Booking.id.desc()).all()
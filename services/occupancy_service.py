@@ -0,0 +1,88 @@
+from datetime import datetime
+from flask import current_app
+from threading import Lock
+import time
+from sqlalchemy import func
+from models import db, Booking, Car, Location
+from enums import BookingStatus, CarStatus
+
+ON_TRIP_STATUSES = [BookingStatus.CONFIRMED.value, BookingStatus.NEW.value]
+
+class OccupancySnapshot:
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._data = None
+        self._expires_at = 0
+        self._generation = 0
+        self._lock = Lock()
+
+    def get(self, loader):
+        with self._lock:
+            if self._data is not None and time.monotonic() < self._expires_at:
+                return self._data
+            generation = self._generation
+
+        data = loader()
+        with self._lock:
+            if generation == self._generation:
+                self._data = data
+                self._expires_at = time.monotonic() + self.ttl
+        return data
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._data = None
+
+occupancy_snapshot = OccupancySnapshot()
+
+def _load_location_stats():
+    today = datetime.now().date()
+
+    if current_app.config.get('CAR_AVAILABILITY_SOURCE') == 'status':
+        pending = db.session.query(Booking.car_id).filter(
+            Booking.status == BookingStatus.NEW.value,
+            Booking.start_date <= today,
+            Booking.end_date >= today
+        )
+        cars_on_trip = db.session.query(Car.id.label('car_id')).filter(
+            Car.status == CarStatus.BOOKED.value
+        ).union(pending).subquery()
+    else:
+        cars_on_trip = db.session.query(Booking.car_id).filter(
+            Booking.status.in_(ON_TRIP_STATUSES),
+            Booking.start_date <= today,
+            Booking.end_date >= today
+        ).group_by(Booking.car_id).subquery()
+
+    locations_data = db.session.query(
+        Location.id,
+        Location.city,
+        Location.address,
+        Location.max_capacity,
+        func.count(Car.id).label('total_fleet'),
+        func.count(cars_on_trip.c.car_id).label('cars_on_trip')
+    ).outerjoin(Car, Car.location_id == Location.id) \
+        .outerjoin(cars_on_trip, cars_on_trip.c.car_id == Car.id) \
+        .group_by(Location.id, Location.city, Location.address, Location.max_capacity) \
+        .order_by(Location.id).all()
+    
+    stats_data = []
+    for loc in locations_data:
+        occupied_at_station = loc.total_fleet - loc.cars_on_trip
+        occupied_at_station = max(0, occupied_at_station)
+        free_spots = loc.max_capacity - occupied_at_station
+        
+        stats_data.append({
+            'city': loc.city,
+            'address': loc.address,
+            'max_capacity': loc.max_capacity,
+            'total_fleet': loc.total_fleet,
+            'cars_on_trip': loc.cars_on_trip,
+            'free_spots': free_spots
+        })
+
+    return stats_data
+
+def get_location_stats():
+    return occupancy_snapshot.get(_load_location_stats)
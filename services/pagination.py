@@ -0,0 +1,57 @@
+from datetime import date, datetime
+import base64
+import json
+from sqlalchemy import and_, or_
+
+class Page:
+    def __init__(self, items, next_cursor=None, total=None, per_page=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+        self.per_page = per_page
+
+def encode_cursor(values):
+    payload = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(payload.encode('utf8')).decode('ascii')
+
+def decode_cursor(cursor, columns):
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf8'))
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Невірний курсор.')
+
+    decoded = []
+    for value, column in zip(values, columns):
+        python_type = column.type.python_type
+        try:
+            if python_type in (date, datetime):
+                decoded.append(python_type.fromisoformat(value))
+            else:
+                decoded.append(python_type(value))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError('Невірний курсор.')
+    return decoded
+
+def _after_cursor(order_by, values):
+    conditions = []
+    for position, (column, descending) in enumerate(order_by):
+        equal_prefix = [order_by[i][0] == values[i] for i in range(position)]
+        comparison = column < values[position] if descending else column > values[position]
+        conditions.append(and_(*equal_prefix, comparison))
+    return or_(*conditions)
+
+def keyset_paginate(query, order_by, cursor=None, per_page=50, with_total=False):
+    total = query.order_by(None).count() if with_total else None
+
+    columns = [column for column, descending in order_by]
+    if cursor:
+        query = query.filter(_after_cursor(order_by, decode_cursor(cursor, columns)))
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in order_by])
+    items = query.limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in columns])
+
+    return Page(items, next_cursor, total, per_page)
@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class HashingBusyError(Exception):
+    pass
+
+class PasswordHasher:
+    def __init__(self, method='scrypt', iterations=None, max_workers=2, max_pending=16, timeout=5):
+        self.timeout = timeout
+        self._executor = None
+        self._executor_lock = Lock()
+        self.configure(method, iterations, max_workers, max_pending)
+
+    def configure(self, method='scrypt', iterations=None, max_workers=2, max_pending=16, timeout=None):
+        if iterations:
+            if method == 'scrypt':
+                method = f'scrypt:{iterations}:8:1'
+            elif method == 'pbkdf2':
+                method = f'pbkdf2:sha256:{iterations}'
+            else:
+                method = f'{method}:{iterations}'
+        self.method = generate_password_hash('', method=method).split('$', 1)[0]
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.max_workers = max_workers
+            self._slots = BoundedSemaphore(max_workers + max_pending)
+        if timeout is not None:
+            self.timeout = timeout
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password-hash')
+            return self._executor, self._slots
+
+    def _run(self, func, *args):
+        executor, slots = self._get_executor()
+        if not slots.acquire(timeout=self.timeout):
+            raise HashingBusyError()
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future.result()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        return password_hash.split('$', 1)[0] != self.method
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,11 @@
+from sqlalchemy.orm import joinedload
+from models import Booking, Maintenance
+
+def dashboard_options():
+    return (joinedload(Booking.car), joinedload(Booking.review))
+
+def manage_bookings_options():
+    return (joinedload(Booking.car),)
+
+def manage_maintenance_options():
+    return (joinedload(Maintenance.car),)
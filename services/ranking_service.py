@@ -1,24 +1,65 @@
-def calculate_popular_cars(cars, reviews, limit=4, threshold_m=2):
-    if not reviews:
-        return cars[:limit]
+from sqlalchemy import case, cast, func
+from models import db, Car, CarRating, Review
+from services.upsert import upsert
+
+def get_global_rating_mean():
+    total_count, total_sum = db.session.query(
+        func.coalesce(func.sum(CarRating.review_count), 0),
+        func.coalesce(func.sum(CarRating.rating_sum), 0)
+    ).one()
+    if not total_count:
+        return None
+    return total_sum / total_count
+
+def calculate_popular_cars(limit=4, threshold_m=2):
+    C = get_global_rating_mean()
+    if C is None:
+        return Car.query.order_by(Car.id).limit(limit).all()
 
-    C = sum(r.rating for r in reviews) / len(reviews)
     m = threshold_m
+    score = case(
+        (CarRating.review_count > 0,
+         (cast(CarRating.rating_sum, db.Float) + m * C) / (CarRating.review_count + m)),
+        else_=0.0
+    )
+
+    rows = db.session.query(Car, score.label('score')) \
+        .outerjoin(CarRating, CarRating.car_id == Car.id) \
+        .order_by(score.desc(), Car.id) \
+        .limit(limit).all()
+
+    popular_cars = []
+    for car, car_score in rows:
+        car.popularity_score = car_score or 0
+        popular_cars.append(car)
+
+    return popular_cars
+
+def record_review_rating(car_id, rating):
+    upsert(CarRating, {'car_id': car_id, 'review_count': 1, 'rating_sum': rating},
+           index_elements=['car_id'], increments=['review_count', 'rating_sum'])
+
+def _actual_rating_totals():
+    rows = db.session.query(Review.car_id, func.count(Review.id), func.sum(Review.rating)) \
+        .group_by(Review.car_id).all()
+    return {car_id: (count, total or 0) for car_id, count, total in rows}
+
+def rebuild_rating_aggregates():
+    totals = _actual_rating_totals()
+    CarRating.query.delete()
+    for car_id, (count, total) in totals.items():
+        db.session.add(CarRating(car_id=car_id, review_count=count, rating_sum=total))
+    db.session.commit()
+    return len(totals)
+
+def find_rating_mismatches():
+    totals = _actual_rating_totals()
+    stored = {row.car_id: (row.review_count, row.rating_sum) for row in CarRating.query.all()}
 
-    scored_cars = []
-    for car in cars:
-        car_reviews = [r for r in reviews if r.car_id == car.id]
-        v = len(car_reviews)
-        
-        if v == 0:
-            score = 0
-        else:
-            R = sum(r.rating for r in car_reviews) / v
-            score = (v / (v + m)) * R + (m / (v + m)) * C
-
-        car.popularity_score = score
-        scored_cars.append(car)
-
-    scored_cars.sort(key=lambda x: x.popularity_score, reverse=True)
-    
-    return scored_cars[:limit]
+    mismatches = []
+    for car_id in sorted(set(totals) | set(stored)):
+        actual = totals.get(car_id, (0, 0))
+        saved = stored.get(car_id, (0, 0))
+        if actual != saved:
+            mismatches.append((car_id, saved, actual))
+    return mismatches
@@ -1,4 +1,8 @@
+from sqlalchemy.orm import joinedload
 from models import db, Review
+from services.pagination import keyset_paginate
+from services.ranking_service import record_review_rating
+from response_cache import response_cache
 
 def create_review(user_id, booking, form_data):
     if booking.user_id != user_id:
@@ -29,5 +33,12 @@ def create_review(user_id, booking, form_data):
     )
     
     db.session.add(new_review)
+    record_review_rating(booking.car_id, rating)
     db.session.commit()
+    response_cache.bump()
     return True, 'Дякуємо за ваш відгук!'
+
+def get_review_page(car_id, cursor=None, limit=10):
+    query = Review.query.options(joinedload(Review.user)).filter(Review.car_id == car_id)
+    page = keyset_paginate(query, [(Review.created_at, True), (Review.id, True)], cursor, per_page=limit)
+    return page.items, page.next_cursor
@@ -0,0 +1,76 @@
+from collections import defaultdict
+from sqlalchemy import func, insert, select
+from datetime import datetime
+from models import db, AggregateMarker, Booking, BookingDailyRollup, Car
+from enums import BookingStatus
+from services.upsert import upsert
+
+COUNTED_STATUSES = [BookingStatus.CONFIRMED.value, BookingStatus.COMPLETED.value]
+
+ROLLUP_MARKER = 'booking_daily_rollup'
+
+def has_rollup():
+    return db.session.get(AggregateMarker, ROLLUP_MARKER) is not None
+
+def _apply_delta(day, location_id, car_class, income, count):
+    updated = BookingDailyRollup.query.filter(
+        BookingDailyRollup.date == day,
+        BookingDailyRollup.location_id == location_id,
+        BookingDailyRollup.car_class == car_class
+    ).update({
+        BookingDailyRollup.income: BookingDailyRollup.income + income,
+        BookingDailyRollup.booking_count: BookingDailyRollup.booking_count + count
+    }, synchronize_session=False)
+
+    if not updated:
+        upsert(BookingDailyRollup, {
+            'date': day, 'location_id': location_id, 'car_class': car_class,
+            'income': income, 'booking_count': count
+        }, index_elements=['date', 'location_id', 'car_class'], increments=['income', 'booking_count'])
+
+def record_status_change(booking, old_status):
+    was_counted = old_status in COUNTED_STATUSES
+    is_counted = booking.status in COUNTED_STATUSES
+    if was_counted == is_counted or not has_rollup():
+        return
+
+    sign = 1 if is_counted else -1
+    _apply_delta(booking.start_date, booking.car.location_id, booking.car.car_class,
+                 sign * booking.total_price, sign)
+
+def rebuild_daily_rollup():
+    BookingDailyRollup.query.delete()
+
+    rows = select(
+        Booking.start_date,
+        Car.location_id,
+        Car.car_class,
+        func.sum(Booking.total_price),
+        func.count(Booking.id)
+    ).join(Car, Booking.car_id == Car.id).where(
+        Booking.status.in_(COUNTED_STATUSES)
+    ).group_by(Booking.start_date, Car.location_id, Car.car_class)
+
+    result = db.session.execute(insert(BookingDailyRollup).from_select(
+        ['date', 'location_id', 'car_class', 'income', 'booking_count'], rows
+    ))
+    db.session.merge(AggregateMarker(name=ROLLUP_MARKER, built_at=datetime.now()))
+    db.session.commit()
+    return result.rowcount
+
+def record_imported_bookings(rows):
+    counted = [row for row in rows if row['status'] in COUNTED_STATUSES]
+    if not counted or not has_rollup():
+        return
+
+    cars = {car.id: car for car in db.session.query(Car.id, Car.location_id, Car.car_class).filter(
+        Car.id.in_({row['car_id'] for row in counted})
+    )}
+    totals = defaultdict(lambda: [0, 0])
+    for row in counted:
+        car = cars[row['car_id']]
+        totals[(row['start_date'], car.location_id, car.car_class)][0] += row['total_price']
+        totals[(row['start_date'], car.location_id, car.car_class)][1] += 1
+
+    for (day, location_id, car_class), (income, count) in totals.items():
+        _apply_delta(day, location_id, car_class, income, count)
@@ -1,191 +1,223 @@
-from sqlalchemy import text
+from sqlalchemy import cast, func, text
 from datetime import datetime, timedelta
-from collections import defaultdict
-from flask import flash
-from models import db, Car, Location, Booking, Maintenance
-from enums import BookingStatus
+from models import db, Car, Location, Booking, BookingDailyRollup, Maintenance
+from plot_cache import plot_cache
+from services.occupancy_service import get_location_stats
+from services.rollup_service import COUNTED_STATUSES, has_rollup
 
-def get_statistics_context(request_args):
-    locations_query = text(f"""
-        SELECT 
-            l.id, 
-            l.city, 
-            l.address, 
-            l.max_capacity,
-            (SELECT COUNT(*) FROM cars c WHERE c.location_id = l.id) as total_fleet,
-            (
-                SELECT COUNT(*) 
-                FROM bookings b 
-                JOIN cars c ON b.car_id = c.id
-                WHERE c.location_id = l.id 
-                AND b.status IN ('{BookingStatus.CONFIRMED.value}', '{BookingStatus.NEW.value}') 
-                AND CURRENT_DATE BETWEEN b.start_date AND b.end_date
-            ) as cars_on_trip
-        FROM locations l
-    """)
-    
-    locations_data = db.session.execute(locations_query).fetchall()
+def date_bucket(column, aggregation_type):
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        if aggregation_type == 'week':
+            return func.to_char(func.date_trunc('week', column), 'YYYY-MM-DD')
+        if aggregation_type == 'month':
+            return func.to_char(column, 'YYYY-MM')
+        return func.to_char(column, 'YYYY-MM-DD')
+
+    if aggregation_type == 'week':
+        weekday = (cast(func.strftime('%w', column), db.Integer) + 6) % 7
+        return func.date(column, '-' + cast(weekday, db.String) + ' days')
+    if aggregation_type == 'month':
+        return func.strftime('%Y-%m', column)
+    return func.strftime('%Y-%m-%d', column)
+
+def iter_buckets(aggregation_type, start_date, end_date):
+    if aggregation_type == 'week':
+        current = start_date - timedelta(days=start_date.weekday())
+    elif aggregation_type == 'month':
+        current = start_date.replace(day=1)
+    else:
+        current = start_date
+
+    while current <= end_date:
+        yield current.strftime('%Y-%m') if aggregation_type == 'month' else current.strftime('%Y-%m-%d')
+        if aggregation_type == 'week':
+            current += timedelta(weeks=1)
+        elif aggregation_type == 'month':
+            current = (current + timedelta(days=32)).replace(day=1)
+        else:
+            current += timedelta(days=1)
+
+def bucket_label(bucket, aggregation_type):
+    if aggregation_type == 'week':
+        isoyear, isoweek, isoday = datetime.strptime(bucket, '%Y-%m-%d').date().isocalendar()
+        return f"{isoyear}-W{isoweek:02d}"
+    return bucket
+
+def fill_buckets(rows, aggregation_type, start_date, end_date):
+    totals = {bucket: (total or 0, count or 0) for bucket, total, count in rows}
+    return [
+        (bucket_label(bucket, aggregation_type),) + totals.get(bucket, (0, 0))
+        for bucket in iter_buckets(aggregation_type, start_date, end_date)
+    ]
+
+def _booking_series_query(aggregation_type, start_date, end_date):
+    bucket = date_bucket(Booking.start_date, aggregation_type)
     
-    stats_data = []
-    for loc in locations_data:
-        occupied_at_station = loc.total_fleet - loc.cars_on_trip
-        occupied_at_station = max(0, occupied_at_station)
-        free_spots = loc.max_capacity - occupied_at_station
-        
-        stats_data.append({
-            'city': loc.city,
-            'address': loc.address,
-            'max_capacity': loc.max_capacity,
-            'total_fleet': loc.total_fleet,
-            'cars_on_trip': loc.cars_on_trip,
-            'free_spots': free_spots
-        })
+    query = db.session.query(
+        bucket.label('bucket'),
+        func.sum(Booking.total_price),
+        func.count(Booking.id)
+    ).join(Car, Booking.car_id == Car.id).filter(
+        Booking.status.in_(COUNTED_STATUSES),
+        Booking.start_date >= start_date,
+        Booking.start_date <= end_date
+    )
+    return query, bucket, Car.location_id, Car.car_class
 
-    filter_loc_id = request_args.get('location_id')
-    filter_period = request_args.get('period', 'month')
-    filter_class = request_args.get('car_class')
-    filter_metric = request_args.get('metric', 'income')
-    filter_car_id = request_args.get('maintenance_car_id')
+def _rollup_series_query(aggregation_type, start_date, end_date):
+    bucket = date_bucket(BookingDailyRollup.date, aggregation_type)
+
+    query = db.session.query(
+        bucket.label('bucket'),
+        func.sum(BookingDailyRollup.income),
+        func.sum(BookingDailyRollup.booking_count)
+    ).filter(
+        BookingDailyRollup.date >= start_date,
+        BookingDailyRollup.date <= end_date
+    )
+    return query, bucket, BookingDailyRollup.location_id, BookingDailyRollup.car_class
+
+FILTER_KEYS = ('period', 'location_id', 'car_class', 'metric', 'maintenance_car_id')
+
+def _parse_id(value):
+    if not value or value == 'all':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def get_bucketed_series(aggregation_type, start_date, end_date, location_id=None, car_class=None):
+    build_query = _rollup_series_query if has_rollup() else _booking_series_query
+    query, bucket, location_column, class_column = build_query(aggregation_type, start_date, end_date)
+
+    location_id = _parse_id(location_id)
+    if location_id is not None:
+        query = query.filter(location_column == location_id)
+
+    if car_class and car_class != 'all':
+        query = query.filter(class_column == car_class)
+
+    rows = query.group_by(bucket).all()
+    return fill_buckets(rows, aggregation_type, start_date, end_date)
 
+def resolve_period(period):
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=30)
     aggregation_type = 'day'
 
-    if filter_period == 'week':
+    if period == 'week':
         start_date = end_date - timedelta(weeks=1)
         aggregation_type = 'day'
-    elif filter_period == '2weeks':
+    elif period == '2weeks':
         start_date = end_date - timedelta(weeks=2)
         aggregation_type = 'day'
-    elif filter_period == 'month':
+    elif period == 'month':
         start_date = end_date - timedelta(days=30)
         aggregation_type = 'week'
-    elif filter_period == '3months':
+    elif period == '3months':
         start_date = end_date - timedelta(days=90)
         aggregation_type = 'week'
-    elif filter_period == '6months':
+    elif period == '6months':
         start_date = end_date - timedelta(days=180)
         aggregation_type = 'month'
-    elif filter_period == 'year':
+    elif period == 'year':
         start_date = end_date - timedelta(days=365)
         aggregation_type = 'month'
 
-    base_sql = f"""
-        SELECT b.start_date, b.total_price, b.id
-        FROM bookings b
-        JOIN cars c ON b.car_id = c.id
-        WHERE b.status IN ('{BookingStatus.CONFIRMED.value}', '{BookingStatus.COMPLETED.value}')
-        AND b.start_date >= :start_date
-        AND b.start_date <= :end_date
-    """
-    
-    params = {'start_date': start_date, 'end_date': end_date}
+    return start_date, end_date, aggregation_type
 
-    if filter_loc_id and filter_loc_id != 'all':
-        base_sql += " AND c.location_id = :loc_id"
-        params['loc_id'] = int(filter_loc_id)
+def get_income_series(request_args):
+    filter_loc_id = request_args.get('location_id')
+    filter_period = request_args.get('period', 'month')
+    filter_class = request_args.get('car_class')
+    filter_metric = request_args.get('metric', 'income')
+
+    start_date, end_date, aggregation_type = resolve_period(filter_period)
 
-    if filter_class and filter_class != 'all':
-        base_sql += " AND c.car_class = :car_class"
-        params['car_class'] = filter_class
-        
-    base_sql += " ORDER BY b.start_date ASC"
+    series = get_bucketed_series(aggregation_type, start_date, end_date,
+                                 location_id=filter_loc_id, car_class=filter_class)
     
-    raw_data = db.session.execute(text(base_sql), params).fetchall()
+    days = [bucket for bucket, total, count in series]
+    values = [total if filter_metric == 'income' else count for bucket, total, count in series]
     
-    aggregated_data = defaultdict(float if filter_metric == 'income' else int)
+    return days, values, f"{filter_metric.capitalize()} / {filter_period}"
+
+def get_maintenance_summary_series():
+    cars_with_maintenance = db.session.execute(text("""
+        SELECT c.id, c.brand, c.model, c.year, COALESCE(SUM(m.cost), 0) as total_cost
+        FROM cars c
+        LEFT JOIN maintenance m ON c.id = m.car_id
+        GROUP BY c.id, c.brand, c.model, c.year
+        HAVING COALESCE(SUM(m.cost), 0) > 0
+        ORDER BY total_cost DESC
+        LIMIT 10
+    """)).fetchall()
     
-    for row in raw_data:
-        b_date = row[0]
-        val = row[1] if filter_metric == 'income' else 1
-        
-        if aggregation_type == 'day':
-            key = b_date.strftime('%Y-%m-%d')
-        elif aggregation_type == 'week':
-            isoyear, isoweek, isoday = b_date.isocalendar()
-            key = f"W{isoweek}-{isoyear}"
-        elif aggregation_type == 'month':
-            key = b_date.strftime('%Y-%m')
-            
-        aggregated_data[key] += val
+    if not cars_with_maintenance:
+        return None
+    
+    car_names = [f"{row[1]} {row[2]}" for row in cars_with_maintenance]
+    total_costs = [row[4] for row in cars_with_maintenance]
+    return car_names, total_costs
 
-    if aggregation_type == 'week':
-        temp_data = defaultdict(float if filter_metric == 'income' else int)
-        for row in raw_data:
-            b_date = row[0]
-            val = row[1] if filter_metric == 'income' else 1
-            isoyear, isoweek, isoday = b_date.isocalendar()
-            key = f"{isoyear}-W{isoweek:02d}"
-            temp_data[key] += val
-        aggregated_data = temp_data
-
-    sorted_keys = sorted(aggregated_data.keys())
-    days = sorted_keys
-    values = [aggregated_data[k] for k in sorted_keys]
+def get_maintenance_series(car_id):
+    car_id = _parse_id(car_id)
+    if car_id is None:
+        return None
     
-    plot_url = None
-    try:
-        from plotting import generate_income_plot
-        plot_url = generate_income_plot(days, values, f"{filter_metric.capitalize()} / {filter_period}")
-    except ImportError:
-        flash('Matplotlib не встановлено.', 'warning')
-    except Exception as e:
-        print(f"Помилка побудови графіка: {e}")
-
-    maintenance_plot_url = None
-    maintenance_summary_url = None
-    selected_maintenance_car = None
+    selected_maintenance_car = Car.query.get(car_id)
+    if not selected_maintenance_car:
+        return None
     
-    all_cars = Car.query.all()
+    records = Maintenance.query.filter_by(car_id=car_id).order_by(Maintenance.date.asc()).all()
+    if not records:
+        return None
     
-    try:
-        from plotting import generate_maintenance_summary_plot, generate_maintenance_plot
-        
-        cars_with_maintenance = db.session.execute(text("""
-            SELECT c.id, c.brand, c.model, c.year, COALESCE(SUM(m.cost), 0) as total_cost
-            FROM cars c
-            LEFT JOIN maintenance m ON c.id = m.car_id
-            GROUP BY c.id, c.brand, c.model, c.year
-            HAVING COALESCE(SUM(m.cost), 0) > 0
-            ORDER BY total_cost DESC
-            LIMIT 10
-        """)).fetchall()
-        
-        if cars_with_maintenance:
-            car_names = [f"{row[1]} {row[2]}" for row in cars_with_maintenance]
-            total_costs = [row[4] for row in cars_with_maintenance]
-            maintenance_summary_url = generate_maintenance_summary_plot(car_names, total_costs)
-        
-        if filter_car_id and filter_car_id != 'all':
-            selected_maintenance_car = Car.query.get(int(filter_car_id))
-            if selected_maintenance_car:
-                records = Maintenance.query.filter_by(car_id=int(filter_car_id)).order_by(Maintenance.date.asc()).all()
-                if records:
-                    dates = [r.date.strftime('%d.%m.%Y') for r in records]
-                    costs = [r.cost for r in records]
-                    car_name = f"{selected_maintenance_car.brand} {selected_maintenance_car.model}"
-                    maintenance_plot_url = generate_maintenance_plot(dates, costs, car_name)
-                    
-    except Exception as e:
-        print(f"Помилка побудови графіка обслуговування: {e}")
+    dates = [r.date.strftime('%d.%m.%Y') for r in records]
+    costs = [r.cost for r in records]
+    car_name = f"{selected_maintenance_car.brand} {selected_maintenance_car.model}"
+    return dates, costs, car_name
+
+def get_chart_data(kind, request_args):
+    if kind == 'income':
+        return get_income_series(request_args)
+    if kind == 'maintenance_summary':
+        return get_maintenance_summary_series()
+    if kind == 'maintenance':
+        return get_maintenance_series(request_args.get('maintenance_car_id'))
+    return None
+
+def get_statistics_context(request_args):
+    filter_loc_id = request_args.get('location_id')
+    filter_period = request_args.get('period', 'month')
+    filter_class = request_args.get('car_class')
+    filter_metric = request_args.get('metric', 'income')
+    filter_car_id = request_args.get('maintenance_car_id')
 
+    selected_maintenance_car = None
+    if _parse_id(filter_car_id) is not None:
+        selected_maintenance_car = Car.query.get(_parse_id(filter_car_id))
+
+    all_cars = Car.query.all()
     all_locations = Location.query.all()
     
     car_classes_rows = db.session.execute(text("SELECT DISTINCT car_class FROM cars")).fetchall()
     all_car_classes = [row[0] for row in car_classes_rows]
 
     return {
-        'location_stats': stats_data,
-        'plot_url': plot_url,
+        'location_stats': get_location_stats(),
+        'chart_args': {key: request_args[key] for key in FILTER_KEYS if key in request_args},
         'locations': all_locations,
         'current_loc': filter_loc_id,
         'current_period': filter_period,
         'current_class': filter_class,
         'current_metric': filter_metric,
         'car_classes': all_car_classes,
-        'maintenance_plot_url': maintenance_plot_url,
-        'maintenance_summary_url': maintenance_summary_url,
         'all_cars': all_cars,
         'current_maintenance_car': filter_car_id,
-        'selected_maintenance_car': selected_maintenance_car
+        'selected_maintenance_car': selected_maintenance_car,
+        'plot_cache_stats': plot_cache.stats()
     }
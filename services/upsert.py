@@ -0,0 +1,18 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db
+
+def upsert(model, values, index_elements, increments):
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        statement = postgresql.insert(model)
+    elif dialect == 'sqlite':
+        statement = sqlite.insert(model)
+    else:
+        raise NotImplementedError(f'Upsert не підтримується для {dialect}.')
+
+    statement = statement.values(**values)
+    table = model.__table__
+    return db.session.execute(statement.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: table.c[column] + statement.excluded[column] for column in increments}
+    ))
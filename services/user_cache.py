@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+import time
+from flask_login import UserMixin
+from models import db, AggregateMarker, User
+
+PRINCIPALS_MARKER = 'principals'
+
+class UserPrincipal(UserMixin):
+    def __init__(self, id, username, email, role, is_blocked):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = role
+        self.is_blocked = is_blocked
+
+class PrincipalCache:
+    def __init__(self, ttl=60, max_size=1024, sync_interval=5):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.sync_interval = sync_interval
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._stamp = None
+        self._next_sync = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def _sync(self):
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_sync:
+                return
+            self._next_sync = now + self.sync_interval
+
+        stamp = db.session.query(AggregateMarker.built_at).filter(
+            AggregateMarker.name == PRINCIPALS_MARKER
+        ).scalar()
+        with self._lock:
+            if stamp != self._stamp:
+                self._stamp = stamp
+                self._generation += 1
+                self._entries.clear()
+
+    def get(self, user_id):
+        self._sync()
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(user_id)
+            if entry and time.monotonic() < entry[1]:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        row = db.session.query(User.id, User.username, User.email, User.role, User.is_blocked) \
+            .filter(User.id == user_id).first()
+        if row is None:
+            return None
+
+        principal = UserPrincipal(row.id, row.username, row.email, row.role, row.is_blocked)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[user_id] = (principal, time.monotonic() + self.ttl)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+        db.session.merge(AggregateMarker(name=PRINCIPALS_MARKER, built_at=datetime.now()))
+        db.session.commit()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0,
+                'entries': len(self._entries)
+            }
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+import random
+from sqlalchemy import insert
+from models import db, Booking, Car, Location, Maintenance, Review, User
+from enums import BookingStatus, CarStatus, UserRole
+from services.booking_lifecycle import sync_car_statuses
+from services.password_hasher import password_hasher
+from services.ranking_service import rebuild_rating_aggregates
+from services.rollup_service import rebuild_daily_rollup
+
+CITIES = ['Київ', 'Львів', 'Одеса', 'Харків', 'Дніпро', 'Вінниця', 'Запоріжжя', 'Ужгород']
+MODELS = {
+    'Economy': [('Skoda', 'Fabia'), ('Renault', 'Logan'), ('Hyundai', 'i20'), ('Kia', 'Rio')],
+    'Comfort': [('Toyota', 'Camry'), ('Volkswagen', 'Passat'), ('Skoda', 'Octavia'), ('Mazda', '6')],
+    'Business': [('BMW', '5 Series'), ('Mercedes-Benz', 'E-Class'), ('Audi', 'A6')],
+    'SUV': [('BMW', 'X5'), ('Toyota', 'RAV4'), ('Volvo', 'XC90'), ('Kia', 'Sportage')]
+}
+CLASS_WEIGHTS = {'Economy': 40, 'Comfort': 30, 'Business': 10, 'SUV': 20}
+CLASS_PRICES = {'Economy': (30, 50), 'Comfort': (50, 90), 'Business': (100, 200), 'SUV': (80, 160)}
+MAINTENANCE_WORKS = ['Заміна масла', 'Заміна шин', 'Гальмівні колодки', 'Діагностика', 'Кузовний ремонт']
+HISTORY_DAYS = 730
+FUTURE_DAYS = 60
+
+def _bulk_insert(model, rows, chunk_size=1000):
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(insert(model), rows[start:start + chunk_size])
+
+def _booking_status(rng, start_date, end_date, today):
+    if end_date < today:
+        return BookingStatus.COMPLETED.value if rng.random() < 0.85 else BookingStatus.CANCELED.value
+    if start_date <= today:
+        return BookingStatus.CONFIRMED.value
+    return rng.choices(
+        [BookingStatus.NEW.value, BookingStatus.CONFIRMED.value, BookingStatus.CANCELED.value], [50, 40, 10]
+    )[0]
+
+def _car_bookings(rng, car, count, user_ids, today):
+    rows = []
+    current = today - timedelta(days=HISTORY_DAYS)
+    average_gap = max(1, (HISTORY_DAYS + FUTURE_DAYS) // max(count, 1) - 4)
+    for _ in range(count):
+        current += timedelta(days=int(rng.expovariate(1 / average_gap)))
+        days = min(14, 1 + int(rng.expovariate(1 / 3)))
+        start_date, end_date = current, current + timedelta(days=days)
+        if start_date > today + timedelta(days=FUTURE_DAYS):
+            break
+        rows.append({
+            'car_id': car['id'],
+            'user_id': rng.choice(user_ids),
+            'start_date': start_date,
+            'end_date': end_date,
+            'total_price': days * car['price_per_day'],
+            'customer_name': f'Клієнт {rng.randint(1, 99999)}',
+            'customer_phone': f'+380{rng.randint(500000000, 999999999)}',
+            'status': _booking_status(rng, start_date, end_date, today)
+        })
+        current = end_date
+    return rows
+
+def generate_dataset(locations=5, cars=200, users=500, bookings=5000, reviews=1500, maintenance=1000, seed=42):
+    rng = random.Random(seed)
+    today = datetime.now().date()
+    suffix = f'{seed}-{datetime.now().strftime("%Y%m%d%H%M%S")}'
+
+    location_rows = [{
+        'city': CITIES[i % len(CITIES)],
+        'address': f'вул. Синтетична, {i + 1}',
+        'phone_number': f'+380{rng.randint(500000000, 999999999)}',
+        'max_capacity': rng.randint(max(10, cars // max(locations, 1)), max(20, 2 * cars // max(locations, 1)))
+    } for i in range(locations)]
+    _bulk_insert(Location, location_rows)
+    location_ids = [row.id for row in db.session.query(Location.id).order_by(Location.id.desc()).limit(locations)]
+
+    password_hash = password_hasher.hash('password')
+    user_rows = [{
+        'username': f'synthetic_{i}',
+        'email': f'synthetic_{i}_{suffix}@example.com',
+        'password_hash': password_hash,
+        'role': UserRole.ADMIN.value if i == 0 else UserRole.MANAGER.value if i <= max(1, users // 100) else UserRole.USER.value,
+        'is_blocked': rng.random() < 0.01 and i > max(1, users // 100)
+    } for i in range(users)]
+    _bulk_insert(User, user_rows)
+    user_ids = [row.id for row in db.session.query(User.id).filter(User.email.like(f'%_{suffix}@example.com'))]
+
+    classes = list(CLASS_WEIGHTS)
+    car_rows = []
+    for i in range(cars):
+        car_class = rng.choices(classes, [CLASS_WEIGHTS[name] for name in classes])[0]
+        brand, model = rng.choice(MODELS[car_class])
+        car_rows.append({
+            'brand': brand,
+            'model': model,
+            'year': rng.randint(today.year - 8, today.year),
+            'price_per_day': rng.randint(*CLASS_PRICES[car_class]),
+            'transmission': rng.choice(['Автомат', 'Механіка']),
+            'fuel_type': rng.choices(['Бензин', 'Дизель', 'Гібрид', 'Електро'], [50, 30, 15, 5])[0],
+            'seats': 7 if car_class == 'SUV' and rng.random() < 0.3 else 5,
+            'description': f'{brand} {model}',
+            'car_class': car_class,
+            'status': rng.choices([CarStatus.AVAILABLE.value, CarStatus.MAINTENANCE.value], [95, 5])[0],
+            'location_id': rng.choice(location_ids) if location_ids else None
+        })
+    _bulk_insert(Car, car_rows)
+    car_list = [
+        {'id': row.id, 'price_per_day': row.price_per_day}
+        for row in db.session.query(Car.id, Car.price_per_day).order_by(Car.id.desc()).limit(cars)
+    ]
+
+    booking_rows = []
+    if car_list and user_ids:
+        per_car = bookings // len(car_list)
+        extra = bookings % len(car_list)
+        for index, car in enumerate(car_list):
+            booking_rows.extend(_car_bookings(rng, car, per_car + (1 if index < extra else 0), user_ids, today))
+    _bulk_insert(Booking, booking_rows)
+
+    completed = db.session.query(Booking.id, Booking.user_id, Booking.car_id, Booking.end_date).filter(
+        Booking.car_id.in_([car['id'] for car in car_list]),
+        Booking.status == BookingStatus.COMPLETED.value,
+        Booking.user_id.isnot(None)
+    ).outerjoin(Review, Review.booking_id == Booking.id).filter(Review.id.is_(None)).order_by(Booking.id).all()
+    review_rows = [{
+        'user_id': row.user_id,
+        'car_id': row.car_id,
+        'booking_id': row.id,
+        'rating': min(10, max(1, round(rng.gauss(8, 1.5)))),
+        'comment': rng.choice(['Чудове авто', 'Все сподобалось', 'Нормально', 'Могло бути чистіше', None]),
+        'created_at': datetime.combine(row.end_date, datetime.min.time()) + timedelta(hours=rng.randint(1, 72))
+    } for row in rng.sample(completed, min(reviews, len(completed)))]
+    _bulk_insert(Review, review_rows)
+
+    maintenance_rows = [{
+        'car_id': rng.choice(car_list)['id'],
+        'date': today - timedelta(days=rng.randint(0, HISTORY_DAYS)),
+        'description': rng.choice(MAINTENANCE_WORKS),
+        'cost': round(rng.lognormvariate(6, 0.8), 2)
+    } for _ in range(maintenance if car_list else 0)]
+    _bulk_insert(Maintenance, maintenance_rows)
+    db.session.commit()
+
+    sync_car_statuses(today)
+    rebuild_rating_aggregates()
+    rebuild_daily_rollup()
+    return {
+        'locations': len(location_rows),
+        'cars': len(car_rows),
+        'users': len(user_rows),
+        'bookings': len(booking_rows),
+        'reviews': len(review_rows),
+        'maintenance': len(maintenance_rows)
+    }
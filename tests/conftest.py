@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix='car-rental-tests-'), 'app.db')
+
+sys.path.insert(0, ROOT)
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+os.environ.setdefault('SECRET_KEY', 'test-secret')
+os.environ['BOOKING_RESERVATION_MODE'] = 'locked'
+
+from app import app as flask_app
+from models import db, User, Location, Car
+from query_counter import assert_page_queries
+
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def car(app):
+    location = Location(city='Київ', address='вул. Тестова, 1', phone_number='+380000000000', max_capacity=10)
+    car = Car(brand='Toyota', model='Corolla', year=2020, price_per_day=40, transmission='Автомат',
+              fuel_type='Бензин', seats=5, location=location)
+    db.session.add(car)
+    db.session.commit()
+    return car
+
+
+@pytest.fixture
+def customer(app):
+    user = User(username='Клієнт', email='client@example.com')
+    user.set_password('password')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def users(app):
+    users = {}
+    for role in ('admin', 'manager', 'user'):
+        user = User(username=role, email=f'{role}@example.com', role=role)
+        user.set_password('password')
+        db.session.add(user)
+        users[role] = user
+    db.session.commit()
+    return users
+
+
+@pytest.fixture
+def page_queries(app):
+    def check(url, user, limit):
+        return assert_page_queries(app, db.engine, url, user.id, limit)
+    return check
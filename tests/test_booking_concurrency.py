@@ -0,0 +1,85 @@
+import multiprocessing
+import sqlite3
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from models import db, Booking
+from enums import BookingStatus
+from services.booking_service import process_booking
+
+WORKERS = 6
+
+
+def _book(car_id, user_id, start_date, end_date, ready, results):
+    from app import app
+    from models import db, Car
+    from services.booking_service import process_booking
+
+    with app.app_context():
+        car = db.session.get(Car, car_id)
+        form = {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'name': 'Клієнт',
+            'phone': '+380501234567'
+        }
+        ready.wait()
+        success, _ = process_booking(user_id, car, form)
+        results.put(success)
+
+
+@pytest.mark.parametrize('backend', ['sql', 'index'])
+def test_concurrent_bookings_do_not_overlap(car, customer, backend, monkeypatch):
+    monkeypatch.setenv('BOOKING_OVERLAP_BACKEND', backend)
+    start_date = date.today() + timedelta(days=10)
+    end_date = start_date + timedelta(days=3)
+
+    context = multiprocessing.get_context('spawn')
+    ready = context.Event()
+    results = context.Queue()
+    workers = [
+        context.Process(target=_book, args=(car.id, customer.id, start_date, end_date, ready, results))
+        for _ in range(WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    ready.set()
+    outcomes = [results.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=60)
+
+    active = Booking.query.filter(
+        Booking.car_id == car.id,
+        Booking.status.notin_([BookingStatus.CANCELED.value, BookingStatus.COMPLETED.value])
+    ).order_by(Booking.start_date).all()
+
+    assert outcomes.count(True) == 1
+    assert len(active) == 1
+    for previous, current in zip(active, active[1:]):
+        assert previous.end_date <= current.start_date
+
+
+def test_contended_reservation_fails_fast(car, customer):
+    start_date = date.today() + timedelta(days=10)
+    form = {
+        'start_date': start_date.isoformat(),
+        'end_date': (start_date + timedelta(days=3)).isoformat(),
+        'name': 'Клієнт',
+        'phone': '+380501234567'
+    }
+
+    holder = sqlite3.connect(db.engine.url.database, isolation_level=None)
+    holder.execute('BEGIN IMMEDIATE')
+    try:
+        started = time.monotonic()
+        success, _ = process_booking(customer.id, car, form)
+        elapsed = time.monotonic() - started
+    finally:
+        holder.execute('ROLLBACK')
+        holder.close()
+
+    assert not success
+    assert elapsed < 1
+    assert Booking.query.filter_by(car_id=car.id).count() == 0
@@ -0,0 +1,30 @@
+from datetime import date, timedelta
+
+import pytest
+
+from commands import QUERY_BUDGETS
+from models import db, Booking, Maintenance
+
+
+@pytest.fixture
+def history(car, users):
+    today = date.today()
+    for offset in range(5):
+        db.session.add(Booking(user_id=users['user'].id, car_id=car.id,
+                               start_date=today + timedelta(days=offset * 3),
+                               end_date=today + timedelta(days=offset * 3 + 2),
+                               total_price=80, customer_name='Клієнт', customer_phone='+380501234567'))
+        db.session.add(Maintenance(car_id=car.id, date=today - timedelta(days=offset),
+                                   description='Заміна мастила', cost=50))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('url, role, limit', QUERY_BUDGETS)
+def test_page_stays_within_query_budget(history, users, page_queries, url, role, limit):
+    counter = page_queries(url, users[role], limit)
+    assert counter.count <= limit
+
+
+def test_budget_check_rejects_error_responses(users, page_queries):
+    with pytest.raises(AssertionError):
+        page_queries('/manage/bookings', users['user'], 100)